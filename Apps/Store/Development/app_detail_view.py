@@ -1,65 +1,58 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                            QPushButton, QScrollArea, QSizePolicy, QFrame,
-                           QMessageBox, QTabWidget, QGridLayout)
-from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
-from PyQt6.QtGui import QPixmap, QIcon, QFont
-import requests
-from io import BytesIO
+                           QMessageBox, QTabWidget, QGridLayout, QProgressDialog,
+                           QDialog)
+from PyQt6.QtCore import Qt, QSize, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap, QIcon, QFont, QCursor
+from catalog import THUMBNAIL_SIZE
+from image_pipeline import (HIGH_PRIORITY, LOW_PRIORITY, NORMAL_PRIORITY, get_image_pipeline,
+                            load_image_into)
+from installed_index import get_installed_index
+from installer import AppInstall, InstallError, get_app_dir
+from package_store import get_package_store
 import os
 import tempfile
 import subprocess
 from pathlib import Path
 
-class ImageLoader(QThread):
-    image_loaded = pyqtSignal(QPixmap)
+class ScreenshotFrame(QFrame):
+    clicked = pyqtSignal(str)
     
-    def __init__(self, url):
-        super().__init__()
+    def __init__(self, url, parent=None):
+        super().__init__(parent)
         self.url = url
+        self.loaded = False
+        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Plain)
+        self.setFixedSize(400, 300)
+        self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         
-    def run(self):
-        try:
-            response = requests.get(self.url)
-            if response.status_code == 200:
-                image_data = BytesIO(response.content)
-                pixmap = QPixmap()
-                pixmap.loadFromData(image_data.getvalue())
-                self.image_loaded.emit(pixmap)
-        except Exception as e:
-            print(f"Error loading image: {str(e)}")
-
-class FileDownloader(QThread):
-    download_complete = pyqtSignal(str)
-    download_error = pyqtSignal(str)
-    download_progress = pyqtSignal(int, int)
-    
-    def __init__(self, url, destination):
-        super().__init__()
-        self.url = url
-        self.destination = destination
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
         
-    def run(self):
-        try:
-            response = requests.get(self.url, stream=True)
-            total_size = int(response.headers.get('content-length', 0))
-            bytes_downloaded = 0
-            
-            with open(self.destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        bytes_downloaded += len(chunk)
-                        self.download_progress.emit(bytes_downloaded, total_size)
-                        
-            self.download_complete.emit(self.destination)
-        except Exception as e:
-            self.download_error.emit(str(e))
+        self.label = QLabel()
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label.setScaledContents(False)
+        layout.addWidget(self.label)
+        
+    def mousePressEvent(self, event):
+        self.clicked.emit(self.url)
+        super().mousePressEvent(event)
 
 class ScreenshotGallery(QWidget):
-    def __init__(self, screenshots, parent=None):
+    """Row of screenshot thumbnails that load as they scroll into view.
+    
+    Thumbnails come from the app's Thumbs/ folder when it has one, and are
+    otherwise scaled from the screenshot (and kept scaled in the disk
+    cache). The full-size image is only downloaded when a screenshot is
+    opened in the viewer.
+    """
+    
+    def __init__(self, screenshots, blob_shas=None, thumbnails=None, parent=None):
         super().__init__(parent)
         self.screenshots = screenshots
-        self.image_loaders = []
+        self.blob_shas = blob_shas or {}
+        self.thumbnails = thumbnails or {}
+        self.frames = []
         self.setup_ui()
         
     def setup_ui(self):
@@ -72,50 +65,171 @@ class ScreenshotGallery(QWidget):
             layout.addWidget(no_screenshots)
             return
             
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.load_visible)
         
         screenshots_widget = QWidget()
         screenshots_layout = QHBoxLayout(screenshots_widget)
         screenshots_layout.setSpacing(10)
         
         for screenshot_url in self.screenshots:
-            screenshot_frame = QFrame()
-            screenshot_frame.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Plain)
-            screenshot_frame.setFixedSize(400, 300)
-            
-            screenshot_layout = QVBoxLayout(screenshot_frame)
-            screenshot_layout.setContentsMargins(0, 0, 0, 0)
-            
-            screenshot_label = QLabel()
-            screenshot_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            screenshot_label.setScaledContents(False)
-            
-            self.load_image(screenshot_url, screenshot_label, QSize(380, 280))
-            
-            screenshot_layout.addWidget(screenshot_label)
+            screenshot_frame = ScreenshotFrame(screenshot_url)
+            screenshot_frame.clicked.connect(self.open_viewer)
             screenshots_layout.addWidget(screenshot_frame)
+            self.frames.append(screenshot_frame)
             
         screenshots_layout.addStretch()
-        scroll_area.setWidget(screenshots_widget)
-        layout.addWidget(scroll_area)
-        
-    def load_image(self, url, label, size):
-        loader = ImageLoader(url)
-        self.image_loaders.append(loader)  # Keep a reference
-        loader.image_loaded.connect(lambda pixmap: label.setPixmap(
-            pixmap.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, 
-                          Qt.TransformationMode.SmoothTransformation)))
-        loader.start()
+        self.scroll_area.setWidget(screenshots_widget)
+        layout.addWidget(self.scroll_area)
+        
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Frame positions are known once the layout has run
+        QTimer.singleShot(0, self.load_visible)
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.load_visible()
+        
+    def load_visible(self):
+        # Frames on screen load first, then one screen ahead either side
+        if not self.frames or not self.isVisible():
+            return
+        left = self.scroll_area.horizontalScrollBar().value()
+        width = self.scroll_area.viewport().width()
+        for frame in self.frames:
+            if frame.loaded:
+                continue
+            x = frame.geometry().x()
+            if left <= x + frame.width() and x <= left + width:
+                priority = NORMAL_PRIORITY
+            elif left - width <= x + frame.width() and x <= left + 2 * width:
+                priority = LOW_PRIORITY
+            else:
+                continue
+            frame.loaded = True
+            url = self.thumbnails.get(frame.url, frame.url)
+            self.load_image(url, frame.label, QSize(*THUMBNAIL_SIZE), priority)
+            
+    def load_image(self, url, label, size, priority=NORMAL_PRIORITY):
+        blob_sha = self.blob_shas.get(url)
+        load_image_into(label, url, size, priority, blob_sha)
+        
+    def open_viewer(self, url):
+        viewer = ScreenshotViewer(self.screenshots, self.screenshots.index(url),
+                                  self.blob_shas, self.frames, self)
+        viewer.show()
+
+class ScreenshotViewer(QDialog):
+    """Full-size screenshot, shown scaled up from its thumbnail until the
+    original has downloaded"""
+    
+    def __init__(self, screenshots, index, blob_shas, frames, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.screenshots = screenshots
+        self.blob_shas = blob_shas
+        self.frames = frames
+        self.index = index
+        self.image = None
+        self.request = None
+        self.failed = False
+        self.setup_ui()
+        self.show_screenshot(index)
+        
+    def setup_ui(self):
+        available = self.screen().availableGeometry()
+        self.resize(int(available.width() * 0.8), int(available.height() * 0.8))
+        
+        layout = QVBoxLayout(self)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setMinimumSize(1, 1)
+        layout.addWidget(self.image_label, 1)
+        
+        buttons = QHBoxLayout()
+        self.previous_button = QPushButton("Previous")
+        self.previous_button.clicked.connect(lambda: self.show_screenshot(self.index - 1))
+        self.next_button = QPushButton("Next")
+        self.next_button.clicked.connect(lambda: self.show_screenshot(self.index + 1))
+        self.position_label = QLabel()
+        self.position_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        buttons.addWidget(self.previous_button)
+        buttons.addWidget(self.position_label, 1)
+        buttons.addWidget(self.next_button)
+        layout.addLayout(buttons)
+        
+    def show_screenshot(self, index):
+        if self.request is not None:
+            get_image_pipeline().cancel(self.request)
+        self.index = index
+        url = self.screenshots[index]
+        self.setWindowTitle(f"Screenshot {index + 1}")
+        self.position_label.setText(f"{index + 1} / {len(self.screenshots)}")
+        self.previous_button.setEnabled(index > 0)
+        self.next_button.setEnabled(index < len(self.screenshots) - 1)
+        
+        thumbnail = self.frames[index].label.pixmap()
+        self.image = thumbnail.toImage() if thumbnail is not None and not thumbnail.isNull() else None
+        self.failed = False
+        self.update_pixmap()
+        self.request = get_image_pipeline().load(
+            url, lambda image, index=index: self.on_image_loaded(index, image),
+            owner=self, priority=HIGH_PRIORITY, blob_sha=self.blob_shas.get(url),
+            error_callback=lambda index=index: self.on_image_failed(index))
+        
+    def on_image_loaded(self, index, image):
+        if index != self.index:
+            return
+        self.request = None
+        self.image = image
+        self.update_pixmap()
+        
+    def on_image_failed(self, index):
+        if index != self.index:
+            return
+        self.request = None
+        self.failed = True
+        # The thumbnail, if there is one, stays up
+        self.position_label.setText(f"{index + 1} / {len(self.screenshots)} - "
+                                    f"full size failed to load")
+        self.update_pixmap()
+        
+    def update_pixmap(self):
+        if self.image is None:
+            self.image_label.setText("Failed to load screenshot" if self.failed else "Loading...")
+            return
+        size = self.image_label.size()
+        if self.image.width() > size.width() or self.image.height() > size.height():
+            image = self.image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                                      Qt.TransformationMode.SmoothTransformation)
+        else:
+            image = self.image
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_pixmap()
+        
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Left and self.index > 0:
+            self.show_screenshot(self.index - 1)
+        elif event.key() == Qt.Key.Key_Right and self.index < len(self.screenshots) - 1:
+            self.show_screenshot(self.index + 1)
+        else:
+            super().keyPressEvent(event)
 
 class AppDetailView(QWidget):
+    installed_changed = pyqtSignal(dict)
+
     def __init__(self, app_data, parent=None):
         super().__init__(parent)
         self.app_data = app_data
-        self.image_loaders = []
-        self.download_threads = []
+        self.blob_shas = app_data.get('blob_shas', {})
+        self.installs = []
         self.setup_ui()
         
     def setup_ui(self):
@@ -130,7 +244,8 @@ class AppDetailView(QWidget):
         self.logo_label = QLabel()
         self.logo_label.setFixedSize(120, 120)
         if self.app_data.get('logo_path'):
-            self.load_image(self.app_data['logo_path'], self.logo_label, QSize(120, 120))
+            self.load_image(self.app_data['logo_path'], self.logo_label, QSize(120, 120),
+                            HIGH_PRIORITY)
         header_layout.addWidget(self.logo_label)
         
         # App title and info
@@ -194,7 +309,9 @@ class AppDetailView(QWidget):
         screenshots_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
         overview_layout.addWidget(screenshots_label)
         
-        screenshots_gallery = ScreenshotGallery(self.app_data.get('screenshots', []))
+        screenshots_gallery = ScreenshotGallery(self.app_data.get('screenshots', []),
+                                                self.blob_shas,
+                                                self.app_data.get('thumbnails', {}))
         overview_layout.addWidget(screenshots_gallery)
         
         # Description section
@@ -243,50 +360,43 @@ class AppDetailView(QWidget):
         
         main_layout.addWidget(tab_widget)
         
-    def load_image(self, url, label, size):
-        loader = ImageLoader(url)
-        self.image_loaders.append(loader)  # Keep a reference
-        loader.image_loaded.connect(lambda pixmap: label.setPixmap(
-            pixmap.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, 
-                          Qt.TransformationMode.SmoothTransformation)))
-        loader.start()
+    def load_image(self, url, label, size, priority=NORMAL_PRIORITY):
+        blob_sha = self.blob_shas.get(url)
+        load_image_into(label, url, size, priority, blob_sha)
         
     def on_install_clicked(self):
-        if not self.app_data.get('package_files'):
-            QMessageBox.warning(self, "Error", "No installable files available.")
+        install = AppInstall(self.app_data)
+        try:
+            install.start()
+        except (InstallError, OSError) as e:
+            QMessageBox.warning(self, "Error", str(e))
             return
             
-        folder_name = self.app_data.get('folder_name', 'unknown_app')
-        
-        # Create app directory in user's AppData
-        app_dir = Path(os.path.expandvars('%LOCALAPPDATA%')) / 'DDPApps' / folder_name
-        app_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Download the first package file
-        package_file = self.app_data['package_files'][0]
-        file_name = package_file['name']
-        download_url = package_file['download_url']
-        
-        destination = app_dir / file_name
-        
-        msg = QMessageBox()
-        msg.setWindowTitle("Download")
-        msg.setText(f"Downloading {file_name}...")
-        msg.setStandardButtons(QMessageBox.StandardButton.Cancel)
-        
-        downloader = FileDownloader(download_url, str(destination))
-        self.download_threads.append(downloader)
-        
-        downloader.download_complete.connect(
-            lambda path: self.on_download_complete(path, msg))
-        downloader.download_error.connect(
-            lambda error: self.on_download_error(error, msg))
-        
-        downloader.start()
-        msg.exec()
+        # Show the combined progress of every package file without
+        # blocking the UI
+        count = len(install.jobs)
+        label = f"Downloading {count} files..." if count > 1 else \
+            f"Downloading {self.app_data['package_files'][0]['name']}..."
+        progress = QProgressDialog(label, "Cancel", 0, 100, self)
+        progress.setWindowTitle("Download")
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(install.cancel)
+        
+        install.progress.connect(lambda done, total: progress.setValue(
+            int(done * 100 / total) if total else 0))
+        install.finished.connect(lambda path: self.installed_changed.emit(self.app_data))
+        install.finished.connect(lambda path: self.on_download_complete(path, progress))
+        install.failed.connect(lambda error: self.on_download_error(error, progress))
+        # Tracked until it ends so the view is not evicted mid-install
+        self.installs.append(install)
+        install.finished.connect(lambda *args: self.installs.remove(install))
+        install.failed.connect(lambda *args: self.installs.remove(install))
+        progress.show()
         
     def on_download_complete(self, path, msg_box):
-        msg_box.accept()
+        msg_box.close()
         
         # Ask to create shortcut
         reply = QMessageBox.question(
@@ -304,7 +414,9 @@ class AppDetailView(QWidget):
         )
         
     def on_download_error(self, error, msg_box):
-        msg_box.accept()
+        msg_box.close()
+        if error == "Download cancelled":
+            return
         QMessageBox.critical(self, "Download Error", f"Error downloading file: {error}")
         
     def create_shortcut(self, target_path):
@@ -326,8 +438,7 @@ class AppDetailView(QWidget):
             QMessageBox.warning(self, "Shortcut Error", f"Failed to create shortcut: {str(e)}")
         
     def on_uninstall_clicked(self):
-        folder_name = self.app_data.get('folder_name', 'unknown_app')
-        app_dir = Path(os.path.expandvars('%LOCALAPPDATA%')) / 'DDPApps' / folder_name
+        app_dir = get_app_dir(self.app_data)
         
         # Check if the app is installed
         if not app_dir.exists():
@@ -346,6 +457,10 @@ class AppDetailView(QWidget):
                 # Remove the app directory
                 import shutil
                 shutil.rmtree(app_dir)
+                get_installed_index().record_uninstall(self.app_data)
+                get_package_store().collect_garbage()
+                self.app_data['is_installed'] = False
+                self.installed_changed.emit(self.app_data)
                 
                 # Remove desktop shortcut
                 desktop = os.path.join(os.path.expanduser('~'), 'Desktop')
@@ -0,0 +1,305 @@
+import time
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QRect, QRectF, QSize, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QPixmap
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate
+
+import metrics
+from image_pipeline import HIGH_PRIORITY, LOW_PRIORITY, get_image_pipeline
+
+APP_DATA_ROLE = Qt.ItemDataRole.UserRole
+
+CARD_SIZE = QSize(250, 300)
+LOGO_SIZE = QSize(180, 180)
+CARD_MARGIN = 10
+
+class AppListModel(QAbstractListModel):
+    """Flat list of app_data dicts shown by the grid.
+
+    Logos are requested from the image pipeline when a row is painted or
+    about to scroll into view (see load_visible), so only cards near the
+    viewport cost a download and decode.
+
+    apps always holds every app; set_filter narrows the rows the view
+    sees to a subset of them (shown), without any per-row callbacks.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.apps = []
+        self.rows = {}  # app_path -> index in apps
+        self.filter_paths = None
+        self.shown = self.apps  # same list as apps while unfiltered
+        self.shown_rows = self.rows  # app_path -> view row
+        self.logo_requests = {}  # logo cache key -> ImageRequest
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.shown)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.shown):
+            return None
+        app_data = self.shown[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return app_data.get('name', 'Unknown App')
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return app_data.get('description', '')
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.logo(app_data)
+        if role == APP_DATA_ROLE:
+            return app_data
+        return None
+
+    def logo_key(self, app_data):
+        url = app_data.get('logo_path')
+        if not url:
+            return None
+        blob_sha = app_data.get('blob_shas', {}).get(url)
+        return (blob_sha or url, LOGO_SIZE.width(), LOGO_SIZE.height())
+
+    def logo(self, app_data):
+        key = self.logo_key(app_data)
+        if key is None:
+            return None
+        pipeline = get_image_pipeline()
+        # Rows are painted over and over while a logo loads; the miss is
+        # counted once, by request_logo
+        if pipeline.memory_cache.contains(key):
+            return pipeline.memory_cache.get(key)
+        # Being painted, so it is on screen
+        self.request_logo(app_data, HIGH_PRIORITY)
+        return None
+
+    def request_logo(self, app_data, priority):
+        key = self.logo_key(app_data)
+        if key is None:
+            return
+        pipeline = get_image_pipeline()
+        existing = self.logo_requests.get(key)
+        if existing is not None:
+            if existing.priority <= priority:
+                return
+            pipeline.cancel(existing)
+        else:
+            pipeline.memory_cache.misses += 1
+        url = app_data['logo_path']
+        app_path = app_data['app_path']
+
+        def forget():
+            # A failed load is tried again the next time the row is painted
+            if self.logo_requests.get(key) is request:
+                del self.logo_requests[key]
+
+        def show(image):
+            forget()
+            pipeline.memory_cache.put(key, QPixmap.fromImage(image))
+            self.refresh_row(app_path)
+        request = pipeline.load(
+            url, show, priority=priority, blob_sha=app_data.get('blob_shas', {}).get(url),
+            size=(LOGO_SIZE.width(), LOGO_SIZE.height()), error_callback=forget)
+        self.logo_requests[key] = request
+
+    def load_visible(self, visible_rows, prefetch_rows):
+        """Load logos for visible_rows first, prefetch_rows at low priority,
+        and cancel pending loads for every other row."""
+        wanted = {}
+        for priority, rows in ((HIGH_PRIORITY, visible_rows), (LOW_PRIORITY, prefetch_rows)):
+            for row in rows:
+                if 0 <= row < len(self.shown):
+                    app_data = self.shown[row]
+                    key = self.logo_key(app_data)
+                    if key is not None and key not in wanted:
+                        wanted[key] = (app_data, priority)
+
+        pipeline = get_image_pipeline()
+        for key, request in list(self.logo_requests.items()):
+            if key not in wanted:
+                pipeline.cancel(request)
+                del self.logo_requests[key]
+
+        for key, (app_data, priority) in wanted.items():
+            if not pipeline.memory_cache.contains(key):
+                self.request_logo(app_data, priority)
+
+    def refresh_row(self, app_path):
+        row = self.shown_rows.get(app_path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def app_data(self, app_path):
+        row = self.rows.get(app_path)
+        return None if row is None else self.apps[row]
+
+    def app_paths(self):
+        return [app_data['app_path'] for app_data in self.apps]
+
+    def is_filtered(self):
+        return self.filter_paths is not None
+
+    def set_filter(self, app_paths):
+        """Show only the apps whose app_path is in app_paths, or every app
+        for None. Apps added while filtered stay hidden until the next call."""
+        self.beginResetModel()
+        self.filter_paths = app_paths
+        if app_paths is None:
+            self.shown = self.apps
+            self.shown_rows = self.rows
+        else:
+            self.shown = [app_data for app_data in self.apps if app_data['app_path'] in app_paths]
+            self.shown_rows = {app_data['app_path']: i for i, app_data in enumerate(self.shown)}
+        self.endResetModel()
+
+    def add_app(self, app_data):
+        row = len(self.apps)
+        if self.is_filtered():
+            self.apps.append(app_data)
+            self.rows[app_data['app_path']] = row
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.apps.append(app_data)
+        self.rows[app_data['app_path']] = row
+        self.endInsertRows()
+
+    def add_apps(self, apps):
+        """Append many apps with a single insert notification"""
+        if not apps:
+            return
+        first = len(self.apps)
+        if not self.is_filtered():
+            self.beginInsertRows(QModelIndex(), first, first + len(apps) - 1)
+        self.apps.extend(apps)
+        self.rows.update((app_data['app_path'], first + i) for i, app_data in enumerate(apps))
+        if not self.is_filtered():
+            self.endInsertRows()
+
+    def update_app(self, app_data):
+        app_path = app_data['app_path']
+        self.apps[self.rows[app_path]] = app_data
+        row = self.shown_rows.get(app_path)
+        if row is None:
+            return
+        self.shown[row] = app_data
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove_app(self, app_path):
+        self.remove_apps([app_path])
+
+    def remove_apps(self, app_paths):
+        """Remove many apps, rebuilding the row maps once"""
+        removed = set(app_paths) & self.rows.keys()
+        if not removed:
+            return
+        # Contiguous runs of shown rows, removed from the bottom up so
+        # the rows still to remove keep their numbers
+        shown_rows = sorted((self.shown_rows[app_path] for app_path in removed
+                             if app_path in self.shown_rows), reverse=True)
+        runs = []
+        for row in shown_rows:
+            if runs and runs[-1][0] == row + 1:
+                runs[-1][0] = row
+            else:
+                runs.append([row, row])
+        for first, last in runs:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.shown[first:last + 1]
+            self.endRemoveRows()
+
+        if self.is_filtered():
+            self.apps[:] = [app_data for app_data in self.apps
+                            if app_data['app_path'] not in removed]
+            self.shown_rows = {app_data['app_path']: i for i, app_data in enumerate(self.shown)}
+        self.rows.clear()
+        self.rows.update((app_data['app_path'], i) for i, app_data in enumerate(self.apps))
+
+    def reorder(self, order):
+        if self.is_filtered():
+            self.apps[:] = [self.apps[self.rows[app_path]] for app_path in order]
+            self.rows.clear()
+            self.rows.update((app_path, i) for i, app_path in enumerate(order))
+            self.set_filter(self.filter_paths)
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_paths = self.app_paths()
+        self.apps[:] = [self.apps[self.rows[app_path]] for app_path in order]
+        self.rows.clear()
+        self.rows.update((app_path, i) for i, app_path in enumerate(order))
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_indexes, [self.index(self.rows[old_paths[index.row()]]) for index in old_indexes])
+        self.layoutChanged.emit()
+
+class AppCardDelegate(QStyledItemDelegate):
+    """Paints an app card: logo, bold name and a short description"""
+
+    def sizeHint(self, option, index):
+        return CARD_SIZE
+
+    def paint(self, painter, option, index):
+        start = time.perf_counter()
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        rect = QRect(option.rect.topLeft(), CARD_SIZE)
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(rect), 10, 10)
+        painter.fillPath(path, QColor('#e0e0e0' if hovered else '#f0f0f0'))
+
+        # App logo
+        logo_rect = QRect(rect.left() + (rect.width() - LOGO_SIZE.width()) // 2,
+                          rect.top() + CARD_MARGIN, LOGO_SIZE.width(), LOGO_SIZE.height())
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            x = logo_rect.left() + (logo_rect.width() - pixmap.width()) // 2
+            y = logo_rect.top() + (logo_rect.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+
+        app_data = index.data(APP_DATA_ROLE)
+        if app_data and app_data.get('is_installed'):
+            self.paint_badge(painter, rect, option.font)
+
+        # App name
+        text_left = rect.left() + CARD_MARGIN
+        text_width = rect.width() - 2 * CARD_MARGIN
+        name_font = QFont(option.font)
+        name_font.setPixelSize(16)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.setPen(option.palette.color(option.palette.ColorRole.WindowText))
+        name_top = logo_rect.bottom() + CARD_MARGIN
+        name_rect = QRect(text_left, name_top, text_width, painter.fontMetrics().height())
+        name = painter.fontMetrics().elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignCenter, name)
+
+        # Short description (first 50 chars)
+        desc = index.data(Qt.ItemDataRole.ToolTipRole) or ''
+        short_desc = desc[:50] + '...' if len(desc) > 50 else desc
+        painter.setFont(option.font)
+        painter.setPen(QColor('#555'))
+        desc_top = name_rect.bottom() + CARD_MARGIN // 2
+        desc_rect = QRect(text_left, desc_top, text_width, rect.bottom() - CARD_MARGIN - desc_top)
+        painter.drawText(desc_rect,
+                         Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop
+                         | Qt.TextFlag.TextWordWrap, short_desc)
+
+        painter.restore()
+        metrics.observe('card_paint_seconds', time.perf_counter() - start)
+
+    def paint_badge(self, painter, rect, font):
+        badge_font = QFont(font)
+        badge_font.setPixelSize(11)
+        badge_font.setBold(True)
+        painter.setFont(badge_font)
+        text = "Installed"
+        width = painter.fontMetrics().horizontalAdvance(text) + 12
+        height = painter.fontMetrics().height() + 4
+        badge_rect = QRect(rect.right() - CARD_MARGIN - width, rect.top() + CARD_MARGIN,
+                           width, height)
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(badge_rect), height / 2, height / 2)
+        painter.fillPath(path, QColor('#2e7d32'))
+        painter.setPen(QColor('white'))
+        painter.drawText(badge_rect, Qt.AlignmentFlag.AlignCenter, text)
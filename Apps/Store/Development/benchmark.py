@@ -0,0 +1,252 @@
+"""Benchmark loading the catalog against a local stand-in for GitHub.
+
+A synthetic Apps/ catalog is served by mock_github.MockGitHub and the
+store runs headless (offscreen) in a child interpreter with a fresh data
+directory pointed at it. Each run reports the time to the first card and
+to the full catalog, peak RSS and thread counts, the store's own metrics
+(see metrics.py) and the server's request counts by endpoint. The first run starts cold; later runs reuse
+the caches of the earlier ones.
+
+    python Apps/Store/Development/benchmark.py --apps 1000 --latency 50
+    python Apps/Store/Development/benchmark.py --apps 10000 --mode catalog --json
+
+--edit N adds a last run after N apps were changed on the server; in
+tree mode exactly those N apps must have their Info files fetched again,
+and the benchmark fails otherwise. --output appends the result to a JSON
+lines file so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from measure_startup import git_commit
+from mock_github import MockGitHub, SyntheticRepo
+
+HERE = Path(__file__).resolve().parent
+
+# Runs inside the child interpreter; prints one JSON line
+CHILD = r"""
+import json, os, sys, threading, time
+start = time.perf_counter()
+settle_ms, timeout_ms = int(sys.argv[1]), int(sys.argv[2])
+import main
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+result = {'errors': []}
+peaks = {'threads': 0, 'os_threads': 0}
+
+def elapsed():
+    return round((time.perf_counter() - start) * 1000, 1)
+
+def os_threads():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def sample():
+    peaks['threads'] = max(peaks['threads'], threading.active_count())
+    peaks['os_threads'] = max(peaks['os_threads'], os_threads() or 0)
+
+def finish(timed_out=False):
+    sample()
+    from image_pipeline import get_image_pipeline
+    result.update({
+        'timed_out': timed_out,
+        'apps': len(window.apps_model.apps),
+        'peak_rss_bytes': peak_rss(),
+        'peak_threads': peaks['threads'],
+        'peak_os_threads': peaks['os_threads'] or None,
+        'images': get_image_pipeline().stats(),
+        'metrics': main.metrics.get_metrics().snapshot(),
+    })
+    print(json.dumps(result), flush=True)
+    # Skip shutdown; worker threads may still be running
+    os._exit(0)
+
+# A modal error box would block the run
+main.QMessageBox.warning = lambda parent, title, text, *args: result['errors'].append(text)
+
+class BenchmarkStore(main.AppStore):
+    def on_loading_finished(self):
+        super().on_loading_finished()
+        result['full_catalog_ms'] = elapsed()
+        # Give logos on the first screen a moment to arrive
+        QTimer.singleShot(settle_ms, finish)
+
+app = QApplication(sys.argv)
+window = BenchmarkStore()
+
+def on_rows(*args):
+    if 'first_card_ms' not in result and window.apps_model.rowCount():
+        result['first_card_ms'] = elapsed()
+window.apps_model.rowsInserted.connect(on_rows)
+window.apps_model.modelReset.connect(on_rows)
+
+sampler = QTimer()
+sampler.timeout.connect(sample)
+sampler.start(50)
+QTimer.singleShot(timeout_ms, lambda: finish(timed_out=True))
+
+window.show()
+result['window_shown_ms'] = elapsed()
+# Cards from the cached catalog are there before the first fetch
+on_rows()
+app.exec()
+"""
+
+def parse_size(value):
+    try:
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+
+def run_once(mock, data_dir, settle, timeout):
+    env = dict(os.environ)
+    env.update({
+        'QT_QPA_PLATFORM': 'offscreen',
+        'LOCALAPPDATA': str(data_dir),
+        'XDG_DATA_HOME': str(data_dir),
+        'DDPAPPS_API_BASE': mock.api_base,
+        'DDPAPPS_RAW_BASE': mock.raw_base,
+        # Keeps a real token from being read and sent to the stand-in
+        'GITHUB_TOKEN': 'benchmark',
+        'NO_PROXY': '127.0.0.1,localhost',
+    })
+    mock.reset_stats()
+    result = subprocess.run([sys.executable, '-c', CHILD, str(int(settle * 1000)),
+                             str(int(timeout * 1000))],
+                            cwd=HERE, env=env, capture_output=True, text=True,
+                            timeout=timeout + 60)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            run = json.loads(line)
+            run['server'] = mock.stats()
+            return run
+    raise RuntimeError(f"Benchmark run failed:\n{result.stderr}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DDP App Store against a "
+                                                 "local mock of the GitHub API")
+    parser.add_argument('--apps', type=int, default=100, help="number of synthetic apps")
+    parser.add_argument('--mode', choices=('catalog', 'tree', 'contents'), default='tree',
+                        help="which listing the server offers (default: tree)")
+    parser.add_argument('--logo-size', type=parse_size, default=(128, 128), metavar='WxH')
+    parser.add_argument('--screenshots', type=int, default=3, help="screenshots per app")
+    parser.add_argument('--screenshot-size', type=parse_size, default=(1280, 720), metavar='WxH')
+    parser.add_argument('--package-size', type=int, default=1024 * 1024,
+                        help="package file size in bytes")
+    parser.add_argument('--latency', type=float, default=0,
+                        help="milliseconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0,
+                        help="up to this many random milliseconds more")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="fraction of requests answered with a 503")
+    parser.add_argument('--runs', type=int, default=2,
+                        help="runs sharing one data directory; the first is cold")
+    parser.add_argument('--settle', type=float, default=1.0,
+                        help="seconds to wait for images after the catalog loaded")
+    parser.add_argument('--edit', type=int, default=0, metavar='N',
+                        help="finish with a run after editing N apps")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds per run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="append the result to this JSON lines file")
+    parser.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args()
+
+    repo = SyntheticRepo(args.apps, args.logo_size, args.screenshots, args.screenshot_size,
+                         args.package_size, args.seed)
+    mock = MockGitHub(repo, args.mode, args.latency / 1000, args.jitter / 1000,
+                      args.error_rate, args.seed).start()
+    data_dir = Path(tempfile.mkdtemp(prefix='ddpapps-benchmark-'))
+    try:
+        runs = []
+        for index in range(args.runs):
+            run = run_once(mock, data_dir, args.settle, args.timeout)
+            run['cold'] = index == 0
+            runs.append(run)
+        if args.edit:
+            edited = mock.edit_apps(args.edit)
+            run = run_once(mock, data_dir, args.settle, args.timeout)
+            run['cold'] = False
+            run['edited_apps'] = len(edited)
+            run['refetched_apps'] = run['server']['info_apps']
+            runs.append(run)
+    finally:
+        mock.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    # Only the tree listing carries the tree SHAs that let unchanged
+    # apps be skipped
+    mismatch = args.edit and args.mode == 'tree' and \
+        runs[-1]['refetched_apps'] != runs[-1]['edited_apps']
+
+    config = {key: value for key, value in vars(args).items()
+              if key not in ('output', 'json', 'runs', 'timeout')}
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'runs': runs,
+    }
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    if args.json:
+        print(json.dumps(record, indent=2))
+        sys.exit(1 if mismatch else 0)
+    for index, run in enumerate(runs):
+        rss = run['peak_rss_bytes']
+        rss = f"{rss / 1024 / 1024:.0f} MB" if rss else "n/a"
+        if 'edited_apps' in run:
+            kind = f"{run['edited_apps']} edited, {run['refetched_apps']} re-fetched"
+        else:
+            kind = 'cold' if run['cold'] else 'warm'
+        print(f"run {index + 1} ({kind}): "
+              f"first card {run.get('first_card_ms')} ms, "
+              f"full catalog {run.get('full_catalog_ms')} ms, {run['apps']} apps, "
+              f"{run['server']['total_requests']} requests, peak RSS {rss}, "
+              f"{run['peak_threads']} threads" + (" (timed out)" if run['timed_out'] else ""))
+        for error in run['errors']:
+            print(f"  error: {error}")
+    if args.output:
+        print(f"Appended to {args.output}")
+    if mismatch:
+        print(f"error: {runs[-1]['refetched_apps']} apps were re-fetched after editing "
+              f"{runs[-1]['edited_apps']}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Build catalog.json from the Apps/<App>/{Info,Images,Thumbs,Package,Deltas} layout.
+
+Run from a checkout before pushing app changes (after build_thumbnails.py
+when screenshots changed and build_deltas.py when packages changed):
+
+    python Apps/Store/Development/build_catalog.py
+
+GitHubFetcher downloads the resulting file in one request and only falls
+back to crawling the repository when it is missing or has an unknown
+version.
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from catalog import (APPS_ROOT, CATALOG_VERSION, INFO_FILES, apply_delta_file,
+                     apply_image_file, apply_info_file, apply_thumbnail_file, git_blob_sha,
+                     new_app_data, raw_url)
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+def list_files(directory):
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.is_file())
+
+def build_app(app_dir):
+    app_path = f"{APPS_ROOT}/{app_dir.name}"
+    app_data = new_app_data(app_path)
+
+    for section in ('Info', 'Images', 'Thumbs', 'Package', 'Deltas'):
+        for file in list_files(app_dir / section):
+            data = file.read_bytes()
+            url = raw_url(f"{app_path}/{section}/{file.name}")
+            sha = git_blob_sha(data)
+            app_data['blob_shas'][url] = sha
+
+            if section == 'Info':
+                if file.name.lower() in INFO_FILES:
+                    apply_info_file(app_data, file.name, data.decode('utf-8', 'replace'))
+            elif section == 'Images':
+                apply_image_file(app_data, file.name, url)
+            elif section == 'Thumbs':
+                apply_thumbnail_file(app_data, file.name, url)
+            elif section == 'Deltas':
+                apply_delta_file(app_data, file.name, url, len(data), sha)
+            else:
+                app_data['package_files'].append({
+                    'name': file.name,
+                    'download_url': url,
+                    'size': len(data),
+                    'sha': sha,
+                    'sha256': hashlib.sha256(data).hexdigest()
+                })
+
+    return app_data
+
+def build_catalog(root):
+    apps_dir = Path(root) / APPS_ROOT
+    apps = [build_app(d) for d in sorted(apps_dir.iterdir()) if d.is_dir()]
+    return {'version': CATALOG_VERSION, 'apps': apps}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the DDP App Store catalog index")
+    parser.add_argument('--root', default=str(REPO_ROOT),
+                        help="repository root containing the Apps directory")
+    parser.add_argument('--output', help="output path (default: <root>/catalog.json)")
+    args = parser.parse_args()
+
+    output = Path(args.output or os.path.join(args.root, 'catalog.json'))
+    catalog = build_catalog(args.root)
+
+    # Written compact; raw.githubusercontent.com gzips it on the wire
+    tmp_path = output.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, output)
+
+    print(f"Wrote {len(catalog['apps'])} apps to {output}")
+
+if __name__ == "__main__":
+    main()
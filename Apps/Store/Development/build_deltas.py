@@ -0,0 +1,90 @@
+"""Publish binary deltas between consecutive versions of package files.
+
+For every Apps/<App>/Package/<file> the previous versions are read from
+git history, and a delta from each version to the next one is written to
+Apps/<App>/Deltas. Clients that are several versions behind follow the
+chain. Deltas that are not much smaller than the file itself are skipped,
+and deltas for versions that dropped out of the window are removed.
+
+    python Apps/Store/Development/build_deltas.py
+    python Apps/Store/Development/build_catalog.py
+"""
+import argparse
+import subprocess
+from pathlib import Path
+
+from build_catalog import REPO_ROOT, list_files
+from catalog import APPS_ROOT, git_blob_sha
+from delta import DELTA_SUFFIX, MAX_DELTA_RATIO, delta_name, make_delta
+
+DEFAULT_VERSIONS = 3
+
+def git(root, *args):
+    return subprocess.run(['git', *args], cwd=root, check=True,
+                          capture_output=True).stdout
+
+def version_shas(root, path, current_sha, count):
+    """Blob SHAs of path, newest first, starting with the working copy"""
+    shas = [current_sha]
+    commits = git(root, 'log', '--format=%H', '--', path).decode().split()
+    for commit in commits:
+        if len(shas) > count:
+            break
+        try:
+            sha = git(root, 'rev-parse', f"{commit}:{path}").decode().strip()
+        except subprocess.CalledProcessError:
+            continue  # deleted in this commit
+        if sha != shas[-1]:
+            shas.append(sha)
+    return shas
+
+def build_file_deltas(root, package_file, deltas_dir, count):
+    path = package_file.relative_to(root).as_posix()
+    data = package_file.read_bytes()
+    shas = version_shas(root, path, git_blob_sha(data), count)
+
+    wanted = set()
+    target = data
+    for new_sha, old_sha in zip(shas, shas[1:]):
+        source = git(root, 'cat-file', 'blob', old_sha)
+        name = delta_name(package_file.name, old_sha, new_sha)
+        output = deltas_dir / name
+        if not output.exists():
+            delta = make_delta(source, target)
+            if len(delta) > len(target) * MAX_DELTA_RATIO:
+                print(f"Skipped {name}: delta is {len(delta)} of {len(target)} bytes")
+                target = source
+                continue
+            deltas_dir.mkdir(exist_ok=True)
+            output.write_bytes(delta)
+            print(f"Wrote {name} ({len(delta)} of {len(target)} bytes)")
+        wanted.add(name)
+        target = source
+    return wanted
+
+def build_deltas(root, count=DEFAULT_VERSIONS):
+    root = Path(root)
+    for app_dir in sorted((root / APPS_ROOT).iterdir()):
+        if not app_dir.is_dir():
+            continue
+        deltas_dir = app_dir / 'Deltas'
+        wanted = set()
+        for package_file in list_files(app_dir / 'Package'):
+            wanted |= build_file_deltas(root, package_file, deltas_dir, count)
+
+        for stale in list_files(deltas_dir):
+            if stale.name.endswith(DELTA_SUFFIX) and stale.name not in wanted:
+                stale.unlink()
+                print(f"Removed {stale.name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build package deltas for the DDP App Store")
+    parser.add_argument('--root', default=str(REPO_ROOT),
+                        help="repository root containing the Apps directory")
+    parser.add_argument('--versions', type=int, default=DEFAULT_VERSIONS,
+                        help="how many previous versions of each file get a delta")
+    args = parser.parse_args()
+    build_deltas(args.root, args.versions)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Write scaled-down copies of app screenshots for the detail view gallery.
+
+Every Apps/<App>/Images/screen*.png larger than the gallery's thumbnail
+size gets a copy scaled to fit it in Apps/<App>/Thumbs, so clients only
+download the full image when it is opened in the viewer. Thumbnails of
+screenshots that were removed, or that no longer need one, are deleted.
+
+    python Apps/Store/Development/build_thumbnails.py
+    python Apps/Store/Development/build_catalog.py
+"""
+import argparse
+from pathlib import Path
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+from build_catalog import REPO_ROOT, list_files
+from catalog import APPS_ROOT, THUMBNAIL_SIZE
+
+def is_screenshot(path):
+    name = path.name.lower()
+    return name.startswith('screen') and name.endswith('.png')
+
+def build_thumbnail(screenshot, output):
+    """Returns True if screenshot needs a thumbnail, writing it if stale"""
+    image = QImage(str(screenshot))
+    if image.isNull():
+        print(f"Skipped {screenshot}: not a readable image")
+        return False
+    width, height = THUMBNAIL_SIZE
+    if image.width() <= width and image.height() <= height:
+        return False
+    if output.exists() and output.stat().st_mtime >= screenshot.stat().st_mtime:
+        return True
+
+    thumbnail = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    output.parent.mkdir(exist_ok=True)
+    if not thumbnail.save(str(output), 'PNG'):
+        print(f"Failed to write {output}")
+        return False
+    print(f"Wrote {output.parent.parent.name}/Thumbs/{output.name} "
+          f"({output.stat().st_size} of {screenshot.stat().st_size} bytes)")
+    return True
+
+def build_thumbnails(root):
+    root = Path(root)
+    for app_dir in sorted((root / APPS_ROOT).iterdir()):
+        if not app_dir.is_dir():
+            continue
+        thumbs_dir = app_dir / 'Thumbs'
+        wanted = set()
+        for screenshot in list_files(app_dir / 'Images'):
+            if is_screenshot(screenshot) and \
+                    build_thumbnail(screenshot, thumbs_dir / screenshot.name):
+                wanted.add(screenshot.name)
+
+        for stale in list_files(thumbs_dir):
+            if stale.name not in wanted:
+                stale.unlink()
+                print(f"Removed {stale.relative_to(root)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build screenshot thumbnails for the DDP App Store")
+    parser.add_argument('--root', default=str(REPO_ROOT),
+                        help="repository root containing the Apps directory")
+    args = parser.parse_args()
+    build_thumbnails(args.root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import os
+from urllib.parse import quote
+
+from delta import parse_delta_name
+
+REPO = "WeXetProgram/ddpapps"
+BRANCH = "main"
+# Overridable to point the store at a mirror or at the benchmark's
+# stand-in server (see benchmark.py)
+API_BASE = os.environ.get('DDPAPPS_API_BASE', "https://api.github.com").rstrip('/')
+RAW_BASE = os.environ.get('DDPAPPS_RAW_BASE', "https://raw.githubusercontent.com").rstrip('/')
+API_URL = f"{API_BASE}/repos/{REPO}"
+RAW_URL = f"{RAW_BASE}/{REPO}/{BRANCH}"
+APPS_ROOT = "Apps"
+CATALOG_URL = f"{RAW_URL}/catalog.json"
+CATALOG_VERSION = 1
+
+INFO_FILES = ('name.txt', 'description.txt', 'extra.txt')
+
+# Screenshots are shown at this size in the detail view; Thumbs/ holds
+# copies scaled down to fit it
+THUMBNAIL_SIZE = (380, 280)
+
+def parse_extra_file(content):
+    result = {}
+    for line in content.splitlines():
+        if ':' in line:
+            key, value = line.split(':', 1)
+            result[key.strip()] = value.strip()
+        else:  # For lines without a colon
+            parts = line.split()
+            if len(parts) >= 2:
+                key = parts[0]
+                value = ' '.join(parts[1:])
+                result[key] = value
+    return result
+
+def new_app_data(app_path):
+    return {
+        'name': 'Unknown App',
+        'description': '',
+        'logo_path': '',
+        'screenshots': [],
+        'thumbnails': {},
+        'package_files': [],
+        'deltas': [],
+        'is_installed': False,
+        'app_path': app_path,
+        'folder_name': app_path.split('/')[-1],
+        'blob_shas': {}
+    }
+
+def git_blob_sha(data):
+    """SHA-1 of data as git stores it, matching the sha of tree entries."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def raw_url(path):
+    return f"{RAW_URL}/{quote(path)}"
+
+def apply_info_file(app_data, file_name, content):
+    file_name = file_name.lower()
+    if file_name == 'name.txt':
+        app_data['name'] = content.strip()
+    elif file_name == 'description.txt':
+        app_data['description'] = content.strip()
+    elif file_name == 'extra.txt':
+        app_data['extra'] = parse_extra_file(content)
+
+def apply_image_file(app_data, file_name, url):
+    file_name = file_name.lower()
+    if file_name == 'logo.png':
+        app_data['logo_path'] = url
+    elif file_name == 'banner.png':
+        app_data['banner_path'] = url
+    elif file_name.startswith('screen') and file_name.endswith('.png'):
+        app_data['screenshots'].append(url)
+
+def apply_thumbnail_file(app_data, file_name, url):
+    # Keyed by the URL of the screenshot it stands in for
+    if file_name.lower().startswith('screen') and file_name.lower().endswith('.png'):
+        screenshot_url = raw_url(f"{app_data['app_path']}/Images/{file_name}")
+        app_data['thumbnails'][screenshot_url] = url
+
+def apply_delta_file(app_data, file_name, url, size, sha):
+    parsed = parse_delta_name(file_name)
+    if parsed is None:
+        return
+    package_name, from_prefix, to_prefix = parsed
+    app_data['deltas'].append({
+        'name': file_name,
+        'file': package_name,
+        'from': from_prefix,
+        'to': to_prefix,
+        'download_url': url,
+        'size': size,
+        'sha': sha
+    })
+
+def build_apps_from_tree(tree):
+    """Group a recursive git tree listing into app_data dicts.
+
+    Returns a list of (app_data, info_urls) pairs in tree order, where
+    info_urls maps the Info/*.txt files that exist to their raw URLs so
+    the caller only downloads the text blobs it actually needs.
+    """
+    apps = {}
+    for entry in tree:
+        parts = entry['path'].split('/')
+        if parts[0] != APPS_ROOT or len(parts) < 2:
+            continue
+        app_path = '/'.join(parts[:2])
+
+        if len(parts) == 2:
+            if entry['type'] == 'tree':
+                app_data = new_app_data(app_path)
+                app_data['tree_sha'] = entry['sha']
+                apps[app_path] = (app_data, {})
+            continue
+
+        # Only files directly inside Info/, Images/, Thumbs/, Package/ and
+        # Deltas/ matter
+        if app_path not in apps or entry['type'] != 'blob' or len(parts) != 4:
+            continue
+
+        app_data, info_urls = apps[app_path]
+        section, file_name = parts[2], parts[3]
+        url = raw_url(entry['path'])
+        app_data['blob_shas'][url] = entry['sha']
+
+        if section == 'Info':
+            if file_name.lower() in INFO_FILES:
+                info_urls[file_name] = url
+        elif section == 'Images':
+            apply_image_file(app_data, file_name, url)
+        elif section == 'Thumbs':
+            apply_thumbnail_file(app_data, file_name, url)
+        elif section == 'Package':
+            app_data['package_files'].append({
+                'name': file_name,
+                'download_url': url,
+                'size': entry.get('size', 0),
+                'sha': entry['sha']
+            })
+        elif section == 'Deltas':
+            apply_delta_file(app_data, file_name, url, entry.get('size', 0), entry['sha'])
+
+    return list(apps.values())
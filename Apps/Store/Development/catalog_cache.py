@@ -0,0 +1,33 @@
+import json
+import os
+
+from paths import get_cache_dir
+
+CACHE_VERSION = 1
+
+def get_catalog_cache_path():
+    return get_cache_dir() / 'catalog.json'
+
+def load_cached_catalog():
+    """Return the last saved list of app_data dicts, or [] if there is none"""
+    try:
+        with open(get_catalog_cache_path(), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if cached.get('version') != CACHE_VERSION:
+        return []
+    return cached.get('apps', [])
+
+def save_catalog(apps):
+    """Atomically replace the cached catalog with apps"""
+    path = get_catalog_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'apps': apps}, f,
+                      separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error saving catalog cache: {str(e)}")
@@ -0,0 +1,159 @@
+"""Binary deltas between two versions of a package file.
+
+A delta is MAGIC followed by a zlib stream holding the source and target
+sizes and a list of operations that rebuild the target: copy a range of
+the source, or add literal bytes. Published deltas live next to the
+package as Apps/<App>/Deltas/<file>.<from>.<to>.ddpdelta, where from and
+to are the first 12 characters of the git blob SHAs.
+"""
+import struct
+import zlib
+
+MAGIC = b'DDPDLT01'
+DELTA_SUFFIX = '.ddpdelta'
+SHA_PREFIX = 12
+WINDOW = 32
+
+# A delta (or chain of deltas) bigger than this share of the full file is
+# not worth it; the full download is used instead
+MAX_DELTA_RATIO = 0.5
+
+COPY = b'C'
+ADD = b'A'
+END = b'E'
+
+class DeltaError(Exception):
+    pass
+
+def delta_name(file_name, from_sha, to_sha):
+    return f"{file_name}.{from_sha[:SHA_PREFIX]}.{to_sha[:SHA_PREFIX]}{DELTA_SUFFIX}"
+
+def parse_delta_name(name):
+    """Return (file_name, from_prefix, to_prefix), or None if name is not a delta"""
+    if not name.endswith(DELTA_SUFFIX):
+        return None
+    parts = name[:-len(DELTA_SUFFIX)].rsplit('.', 2)
+    if len(parts) != 3 or not all(len(p) == SHA_PREFIX for p in parts[1:]):
+        return None
+    return tuple(parts)
+
+def match_length(source, i, target, j):
+    """Length of the common run at source[i:] and target[j:]"""
+    limit = min(len(source) - i, len(target) - j)
+    length = 0
+    step = 4096
+    while step and length < limit:
+        n = min(step, limit - length)
+        if source[i + length:i + length + n] == target[j + length:j + length + n]:
+            length += n
+            step *= 2
+        else:
+            step //= 2
+    return length
+
+def make_delta(source, target):
+    # Index the source at every WINDOW bytes, then slide over the target
+    # one byte at a time so shifted content is still found
+    index = {}
+    for offset in range(0, len(source) - WINDOW + 1, WINDOW):
+        index.setdefault(source[offset:offset + WINDOW], offset)
+
+    body = [struct.pack('<QQ', len(source), len(target))]
+
+    def add(start, end):
+        if end > start:
+            body.append(ADD + struct.pack('<Q', end - start))
+            body.append(target[start:end])
+
+    literal_start = pos = 0
+    last = len(target) - WINDOW
+    while pos <= last:
+        offset = index.get(target[pos:pos + WINDOW])
+        if offset is None:
+            pos += 1
+            continue
+        back = 0
+        while (back < pos - literal_start and back < offset
+               and source[offset - back - 1] == target[pos - back - 1]):
+            back += 1
+        start = pos - back
+        length = WINDOW + back + match_length(source, offset + WINDOW, target, pos + WINDOW)
+        add(literal_start, start)
+        body.append(COPY + struct.pack('<QQ', offset - back, length))
+        pos = literal_start = start + length
+    add(literal_start, len(target))
+    body.append(END)
+
+    return MAGIC + zlib.compress(b''.join(body), 9)
+
+def apply_delta(source_path, delta, output_path, hasher=None):
+    """Rebuild the target from source_path into output_path.
+
+    hasher, if given, is fed every byte written so the caller can verify
+    the result without reading it back.
+    """
+    if not delta.startswith(MAGIC):
+        raise DeltaError("Not a delta file")
+    try:
+        body = memoryview(zlib.decompress(delta[len(MAGIC):]))
+    except zlib.error as e:
+        raise DeltaError(f"Corrupt delta: {str(e)}")
+
+    source_size, target_size = struct.unpack_from('<QQ', body)
+    pos = 16
+    written = 0
+    with open(source_path, 'rb') as source, open(output_path, 'wb') as output:
+        source.seek(0, 2)
+        if source.tell() != source_size:
+            raise DeltaError("Delta does not apply to the installed version")
+        if hasher:
+            hasher.start(target_size)
+        while True:
+            op = bytes(body[pos:pos + 1])
+            pos += 1
+            if op == COPY:
+                offset, length = struct.unpack_from('<QQ', body, pos)
+                pos += 16
+                source.seek(offset)
+                while length:
+                    data = source.read(min(length, 1024 * 1024))
+                    if not data:
+                        raise DeltaError("Copy past the end of the source")
+                    length -= len(data)
+                    written += len(data)
+                    output.write(data)
+                    if hasher:
+                        hasher.update(data)
+            elif op == ADD:
+                length, = struct.unpack_from('<Q', body, pos)
+                pos += 8
+                data = body[pos:pos + length]
+                pos += length
+                written += len(data)
+                output.write(data)
+                if hasher:
+                    hasher.update(data)
+            elif op == END:
+                break
+            else:
+                raise DeltaError("Corrupt delta: unknown operation")
+    if written != target_size:
+        raise DeltaError("Delta produced the wrong size")
+
+def find_delta_chain(deltas, file_name, from_sha, to_sha, max_size):
+    """Deltas leading from one version of file_name to another, or None
+    when there is no path or it would cost more than max_size bytes"""
+    by_source = {d['from']: d for d in deltas if d['file'] == file_name}
+    current = from_sha[:SHA_PREFIX]
+    chain = []
+    size = 0
+    while current != to_sha[:SHA_PREFIX]:
+        delta = by_source.get(current)
+        if delta is None or len(chain) >= len(by_source):
+            return None
+        size += delta.get('size', 0)
+        if size > max_size:
+            return None
+        chain.append(delta)
+        current = delta['to']
+    return chain
@@ -0,0 +1,260 @@
+import itertools
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from downloader import (DEFAULT_CHUNK_SIZE, DEFAULT_CONNECTIONS, DownloadCancelled,
+                        RangedDownload, discard_partial)
+from http_cache import get_http_cache
+
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+LOW_PRIORITY = 2
+
+QUEUED = 'queued'
+RUNNING = 'running'
+PAUSED = 'paused'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+class RateLimiter:
+    """Token bucket shared by every download thread"""
+
+    def __init__(self, bytes_per_second=None):
+        self.lock = threading.Lock()
+        self.set_rate(bytes_per_second)
+
+    def set_rate(self, bytes_per_second):
+        with self.lock:
+            self.rate = bytes_per_second
+            self.tokens = bytes_per_second or 0
+            self.updated = time.monotonic()
+
+    def consume(self, amount):
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount or self.tokens >= self.rate:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(min(wait, 0.25))
+
+class DownloadJob(QObject):
+    progress = pyqtSignal(int, int)
+    state_changed = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, job_id, url, destination, priority, size=0, hasher=None):
+        super().__init__()
+        self.job_id = job_id
+        self.url = url
+        self.destination = str(destination)
+        self.host = urlparse(url).netloc
+        self.priority = priority
+        self.sequence = job_id
+        self.state = QUEUED
+        self.bytes_done = 0
+        self.total_size = size
+        self.hasher = hasher
+        self.reported = None
+        self.cancel_event = None
+        self.pause_requested = False
+        self.error = ''
+        # Installs sharing the job; it is only cancelled once all let go
+        self.subscribers = 1
+
+class DownloadManager(QObject):
+    """Central download queue shared by every install button.
+
+    Jobs start in priority order while staying under a global and a
+    per-host concurrency cap, can be paused (the partial file is kept and
+    resumed), cancelled or re-prioritised, and share an optional bandwidth
+    limit. Progress is sampled on a timer rather than emitted per chunk.
+    """
+    job_added = pyqtSignal(object)
+    overall_progress = pyqtSignal(int, int)
+    job_done = pyqtSignal(int, str, str)
+
+    def __init__(self, max_concurrent=3, max_per_host=2, bandwidth_limit=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, connections=DEFAULT_CONNECTIONS, parent=None):
+        super().__init__(parent)
+        self.max_concurrent = max_concurrent
+        self.max_per_host = max_per_host
+        self.chunk_size = chunk_size
+        self.connections = connections
+        self.rate_limiter = RateLimiter(bandwidth_limit)
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.job_done.connect(self.on_job_done)
+
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(250)
+        self.progress_timer.timeout.connect(self.report_progress)
+
+    def enqueue(self, url, destination, priority=NORMAL_PRIORITY, size=0, hasher=None):
+        # Requests for a file that is already being fetched share its job
+        for job in self.jobs.values():
+            if job.destination == str(destination):
+                job.subscribers += 1
+                if priority < job.priority:
+                    self.set_priority(job, priority)
+                self.resume(job)
+                return job
+        job = DownloadJob(next(self.ids), url, destination, priority, size, hasher)
+        self.jobs[job.job_id] = job
+        self.job_added.emit(job)
+        self.schedule()
+        return job
+
+    def set_bandwidth_limit(self, bytes_per_second):
+        self.rate_limiter.set_rate(bytes_per_second)
+
+    def set_priority(self, job, priority):
+        job.priority = priority
+        self.schedule()
+
+    def move_to_front(self, job):
+        job.priority = HIGH_PRIORITY
+        job.sequence = -next(self.ids)
+        self.schedule()
+
+    def pause(self, job):
+        if job.state == QUEUED:
+            self.set_state(job, PAUSED)
+        elif job.state == RUNNING:
+            # The worker stops at its next chunk; on_job_done then marks
+            # the job paused instead of cancelled
+            job.pause_requested = True
+            job.cancel_event.set()
+
+    def resume(self, job):
+        if job.state == PAUSED:
+            self.set_state(job, QUEUED)
+            self.schedule()
+
+    def cancel(self, job):
+        """Drop one subscriber's interest in job, stopping it with the last"""
+        job.subscribers -= 1
+        if job.subscribers > 0:
+            return
+        if job.state in (QUEUED, PAUSED):
+            # A job paused earlier left a partial file to resume from
+            discard_partial(job.destination)
+            self.finish(job, CANCELLED, "Download cancelled")
+        elif job.state == RUNNING:
+            job.pause_requested = False
+            job.cancel_event.set()
+
+    def set_state(self, job, state):
+        job.state = state
+        job.state_changed.emit(state)
+
+    def schedule(self):
+        running = [job for job in self.jobs.values() if job.state == RUNNING]
+        queued = sorted((job for job in self.jobs.values() if job.state == QUEUED),
+                        key=lambda job: (job.priority, job.sequence))
+        for job in queued:
+            if len(running) >= self.max_concurrent:
+                break
+            if sum(1 for other in running if other.host == job.host) >= self.max_per_host:
+                continue
+            self.start_job(job)
+            running.append(job)
+        if running and not self.progress_timer.isActive():
+            self.progress_timer.start()
+
+    def start_job(self, job):
+        job.cancel_event = threading.Event()
+        job.pause_requested = False
+        self.set_state(job, RUNNING)
+        threading.Thread(target=self.run_job, args=(job,), name=f"Download-{job.job_id}",
+                         daemon=True).start()
+
+    def run_job(self, job):
+        # Runs on a worker thread; results go back through job_done
+        try:
+            # Skip the transfer when the file on disk is still current
+            http_cache = get_http_cache()
+            headers, meta = http_cache.get_validators(job.url)
+            if meta and meta.get('size') != local_size(job.destination):
+                headers = {}
+
+            def on_progress(done, total):
+                job.bytes_done = done
+                job.total_size = total or job.total_size
+
+            download = RangedDownload(
+                job.url, job.destination, self.chunk_size, self.connections,
+                progress_callback=on_progress, conditional_headers=headers,
+                cancel_event=job.cancel_event, rate_limiter=self.rate_limiter,
+                hasher=job.hasher)
+            if download.run():
+                http_cache.store_validators(job.url, download.response_headers,
+                                            size=local_size(job.destination))
+            job.bytes_done = job.total_size = local_size(job.destination) or 0
+            self.job_done.emit(job.job_id, COMPLETED, job.destination)
+        except DownloadCancelled:
+            if job.pause_requested:
+                self.job_done.emit(job.job_id, PAUSED, "Download paused")
+            else:
+                download.discard()
+                self.job_done.emit(job.job_id, CANCELLED, "Download cancelled")
+        except Exception as e:
+            self.job_done.emit(job.job_id, FAILED, str(e))
+
+    def on_job_done(self, job_id, state, message):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if state == PAUSED:
+            self.set_state(job, PAUSED)
+        else:
+            self.finish(job, state, message)
+        self.schedule()
+
+    def finish(self, job, state, message):
+        self.jobs.pop(job.job_id, None)
+        self.set_state(job, state)
+        job.progress.emit(job.bytes_done, job.total_size)
+        if state == COMPLETED:
+            job.finished.emit(message)
+        else:
+            job.error = message
+            job.failed.emit(message)
+
+    def report_progress(self):
+        done = total = 0
+        for job in self.jobs.values():
+            done += job.bytes_done
+            total += job.total_size
+            snapshot = (job.bytes_done, job.total_size)
+            if job.state == RUNNING and snapshot != job.reported:
+                job.reported = snapshot
+                job.progress.emit(*snapshot)
+        self.overall_progress.emit(done, total)
+        if not any(job.state == RUNNING for job in self.jobs.values()):
+            self.progress_timer.stop()
+
+def local_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+_download_manager = None
+
+def get_download_manager():
+    global _download_manager
+    if _download_manager is None:
+        _download_manager = DownloadManager()
+    return _download_manager
@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+import time
+
+import http_session
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_CONNECTIONS = 4
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+STATE_SAVE_INTERVAL = 1.0
+
+class DownloadCancelled(Exception):
+    pass
+
+class RangedDownload:
+    """Download url to destination over one or more HTTP Range requests.
+
+    Large files on servers that accept ranges are split into segments that
+    download in parallel. Data is written to <destination>.part and the
+    progress of every segment is kept in <destination>.part.json, so an
+    interrupted download resumes where it stopped. The finished file is
+    renamed into place atomically.
+    """
+
+    def __init__(self, url, destination, chunk_size=DEFAULT_CHUNK_SIZE,
+                 connections=DEFAULT_CONNECTIONS, progress_callback=None,
+                 conditional_headers=None, cancel_event=None, rate_limiter=None,
+                 hasher=None):
+        self.url = url
+        self.destination = str(destination)
+        self.part_path = self.destination + '.part'
+        self.state_path = self.destination + '.part.json'
+        self.chunk_size = chunk_size
+        self.connections = max(1, connections)
+        self.progress_callback = progress_callback
+        # Ranges only make sense on the raw bytes
+        self.headers = {'Accept-Encoding': 'identity'}
+        self.conditional_headers = conditional_headers or {}
+        self.cancel_event = cancel_event or threading.Event()
+        self.rate_limiter = rate_limiter
+        self.hasher = hasher
+        self.hash_inline = False
+        self.lock = threading.Lock()
+        self.segments = []
+        self.total_size = 0
+        self.last_state_save = 0
+        self.response_headers = {}
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        probe = http_session.request('HEAD', self.url, allow_redirects=True,
+                                     headers=dict(self.headers, **self.conditional_headers))
+        if probe.status_code == 304:
+            return None
+        probe.raise_for_status()
+        self.response_headers = probe.headers
+
+        self.total_size = int(probe.headers.get('Content-Length', 0) or 0)
+        accepts_ranges = probe.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        validator = probe.headers.get('ETag') or probe.headers.get('Last-Modified')
+
+        self.segments = self.load_state(validator) if accepts_ranges else None
+        resuming = bool(self.segments)
+        if not resuming:
+            self.segments = self.plan_segments(accepts_ranges)
+            self.save_state(validator, force=True)
+        self.prepare_part_file(resuming)
+
+        # A single fresh stream can be hashed as it arrives; segments that
+        # arrive out of order are hashed once the part file is complete
+        self.hash_inline = bool(self.hasher and self.total_size and not resuming
+                                and len(self.segments) == 1)
+        if self.hash_inline:
+            self.hasher.start(self.total_size)
+
+        errors = []
+
+        def download(segment):
+            try:
+                self.download_segment(segment, accepts_ranges, validator)
+            except Exception as e:
+                errors.append(e)
+                self.cancel_event.set()
+
+        workers = [threading.Thread(target=download, args=(segment,), daemon=True)
+                   for segment in self.segments if not self.segment_done(segment)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.save_state(validator, force=True)
+        if errors:
+            raise errors[0]
+        if self.cancel_event.is_set():
+            raise DownloadCancelled(self.url)
+
+        # The part file is sized up front, so only the segments tell
+        # whether every byte arrived
+        if not all(self.segment_done(segment) for segment in self.segments
+                   if segment['end'] is not None):
+            raise IOError(f"Incomplete download of {self.url}")
+        if self.hasher:
+            if not self.hash_inline:
+                self.hasher.hash_file(self.part_path)
+            try:
+                self.hasher.verify(self.destination)
+            except Exception:
+                self.discard()
+                raise
+        os.replace(self.part_path, self.destination)
+        self.remove_state()
+        return self.destination
+
+    def plan_segments(self, accepts_ranges):
+        if not self.total_size:
+            return [{'start': 0, 'end': None, 'done': 0}]
+        count = 1
+        if accepts_ranges:
+            count = min(self.connections, max(1, self.total_size // MIN_SEGMENT_SIZE))
+        size = -(-self.total_size // count)
+        return [{'start': start, 'end': min(start + size, self.total_size) - 1, 'done': 0}
+                for start in range(0, self.total_size, size)]
+
+    def segment_done(self, segment):
+        return segment['end'] is not None and segment['start'] + segment['done'] > segment['end']
+
+    def prepare_part_file(self, resuming):
+        with open(self.part_path, 'r+b' if resuming else 'wb') as f:
+            if self.total_size:
+                f.truncate(self.total_size)
+                if not resuming and hasattr(os, 'posix_fallocate'):
+                    # Reserve the blocks now so a full disk fails up front
+                    os.posix_fallocate(f.fileno(), 0, self.total_size)
+
+    def download_segment(self, segment, accepts_ranges, validator):
+        # A 206 may carry less than the requested range; ask again for
+        # the rest until the segment is complete
+        while True:
+            received = self.request_segment(segment, accepts_ranges, validator)
+            if self.cancel_event.is_set() or segment['end'] is None or \
+                    self.segment_done(segment):
+                return
+            if not accepts_ranges or not received:
+                raise IOError(f"Incomplete download of {self.url}: stopped at byte "
+                              f"{segment['start'] + segment['done']}")
+
+    def request_segment(self, segment, accepts_ranges, validator):
+        """Request what is left of segment and write it to the part file.
+        Returns the number of bytes received."""
+        headers = dict(self.headers)
+        offset = segment['start'] + segment['done']
+        if accepts_ranges and (offset or segment['end'] is not None):
+            end = '' if segment['end'] is None else segment['end']
+            headers['Range'] = f"bytes={offset}-{end}"
+            if validator:
+                headers['If-Range'] = validator
+
+        response = http_session.get(self.url, headers=headers, stream=True)
+        response.raise_for_status()
+        if 'Range' in headers and response.status_code != 206:
+            # The file changed or ranges were refused; only a single
+            # segment can restart from scratch
+            if len(self.segments) > 1:
+                raise IOError(f"Server ignored range request for {self.url}")
+            with self.lock:
+                segment['done'] = 0
+            offset = segment['start']
+            if self.hash_inline:
+                self.hasher.start(self.total_size)
+
+        received = 0
+        with open(self.part_path, 'r+b') as f:
+            f.seek(offset)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if self.cancel_event.is_set():
+                    response.close()
+                    return received
+                if not chunk:
+                    continue
+                if self.rate_limiter:
+                    self.rate_limiter.consume(len(chunk))
+                f.write(chunk)
+                if self.hash_inline:
+                    self.hasher.update(chunk)
+                received += len(chunk)
+                with self.lock:
+                    segment['done'] += len(chunk)
+                self.report_progress()
+                self.save_state(validator)
+        return received
+
+    def bytes_done(self):
+        with self.lock:
+            return sum(segment['done'] for segment in self.segments)
+
+    def report_progress(self):
+        if self.progress_callback:
+            self.progress_callback(self.bytes_done(), self.total_size)
+
+    def load_state(self, validator):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (state.get('url') != self.url or state.get('size') != self.total_size
+                or state.get('validator') != validator or not os.path.exists(self.part_path)):
+            return None
+        return state.get('segments')
+
+    def save_state(self, validator, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_state_save < STATE_SAVE_INTERVAL:
+                return
+            self.last_state_save = now
+            state = {'url': self.url, 'size': self.total_size, 'validator': validator,
+                     'segments': [dict(segment) for segment in self.segments]}
+            try:
+                tmp_path = self.state_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.state_path)
+            except OSError as e:
+                print(f"Error saving download state: {str(e)}")
+
+    def discard(self):
+        """Delete the partial download, e.g. after it was cancelled"""
+        discard_partial(self.destination)
+
+    def remove_state(self):
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+def discard_partial(destination):
+    """Delete what a download to destination left behind"""
+    for path in (f"{destination}.part", f"{destination}.part.json"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from http_cache import cached_get
+from paths import get_data_dir
+
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+
+# Requests at the end of a rate-limit window that only high-priority work
+# (the listing and apps on screen) may spend
+RESERVED_REQUESTS = 10
+
+TOKEN_VARIABLES = ('GITHUB_TOKEN', 'GH_TOKEN')
+
+class RateLimitExceeded(Exception):
+    def __init__(self, reset_time):
+        super().__init__("GitHub API rate limit reached until "
+                         f"{time.strftime('%H:%M', time.localtime(reset_time))}")
+        self.reset_time = reset_time
+
+def load_token():
+    """GitHub token from the environment or a .env file, if there is one.
+
+    Without a token the API allows 60 requests an hour; with one, 5000.
+    """
+    for name in TOKEN_VARIABLES:
+        if os.environ.get(name):
+            return os.environ[name]
+    try:
+        from dotenv import dotenv_values
+    except ImportError:
+        return None
+    for path in (Path.cwd() / '.env', Path(__file__).parent / '.env', get_data_dir() / '.env'):
+        if path.is_file():
+            values = dotenv_values(path)
+            for name in TOKEN_VARIABLES:
+                if values.get(name):
+                    return values[name]
+    return None
+
+class GitHubApi:
+    """Sends GitHub API requests within the rate limit.
+
+    The remaining budget and reset time are read from the X-RateLimit
+    headers of every response. Once the budget falls to the reserve, only
+    high-priority requests go out; when it is spent (or GitHub answers
+    with a rate-limit error) requests raise RateLimitExceeded until the
+    window resets, so callers can note what is still missing and retry
+    later instead of hammering the API.
+    """
+
+    def __init__(self, token=None, reserve=RESERVED_REQUESTS):
+        self.token = token
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.limit = None
+        self.remaining = None
+        self.reset_time = 0
+
+    def get(self, url, priority=NORMAL_PRIORITY):
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        # The budget is only spent when the cache has to ask the network;
+        # the hook sees network responses only, including 304s
+        response = cached_get(url, before_request=lambda: self.acquire(priority),
+                              headers=headers, hooks={'response': self.update})
+        if response.status_code in (403, 429) and self.is_exhausted():
+            raise RateLimitExceeded(self.reset_time)
+        return response
+
+    def acquire(self, priority):
+        with self.lock:
+            if self.remaining is None:
+                return
+            if time.time() >= self.reset_time:
+                # New window; the next response reports the fresh budget
+                self.remaining = None
+                return
+            if self.remaining > self.reserve or (self.remaining > 0
+                                                 and priority == HIGH_PRIORITY):
+                # Corrected by the headers of the response
+                self.remaining -= 1
+                return
+            reset_time = self.reset_time
+        raise RateLimitExceeded(reset_time)
+
+    def update(self, response, *args, **kwargs):
+        headers = response.headers
+        with self.lock:
+            if 'X-RateLimit-Remaining' in headers:
+                try:
+                    self.remaining = int(headers['X-RateLimit-Remaining'])
+                    self.limit = int(headers.get('X-RateLimit-Limit', 0)) or self.limit
+                    self.reset_time = float(headers.get('X-RateLimit-Reset', 0))
+                except ValueError:
+                    pass
+            if response.status_code in (403, 429) and 'Retry-After' in headers:
+                # Secondary rate limit
+                try:
+                    retry_after = int(headers['Retry-After'])
+                except ValueError:
+                    retry_after = 60
+                self.remaining = 0
+                self.reset_time = time.time() + retry_after
+        return response
+
+    def is_exhausted(self):
+        with self.lock:
+            return self.remaining == 0 and time.time() < self.reset_time
+
+    def status(self):
+        with self.lock:
+            return {'limit': self.limit, 'remaining': self.remaining,
+                    'reset_time': self.reset_time, 'authenticated': bool(self.token)}
+
+_github_api = None
+_github_api_lock = threading.Lock()
+
+def get_github_api():
+    global _github_api
+    with _github_api_lock:
+        if _github_api is None:
+            _github_api = GitHubApi(load_token())
+        return _github_api
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import http_session
+import metrics
+from paths import get_cache_dir
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Headers describing the transfer rather than the stored (decoded) body
+SKIPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if '=' in part:
+            key, arg = part.split('=', 1)
+            directives[key.strip()] = arg.strip().strip('"')
+        else:
+            directives[part] = True
+    return directives
+
+def get_max_age(headers):
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0
+    try:
+        return int(directives.get('max-age', 0))
+    except ValueError:
+        return 0
+
+class HttpCache:
+    """Disk-backed cache of GET responses keyed by URL.
+
+    Fresh entries (per Cache-Control max-age) are served without touching
+    the network; stale ones are revalidated with If-None-Match /
+    If-Modified-Since and a 304 is answered from disk. Bodies are evicted
+    least-recently-used first once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or (get_cache_dir() / 'http')
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+
+    def get(self, url, before_request=None, **kwargs):
+        """before_request, if given, is called only when the request
+        actually goes out to the network"""
+        meta = self.load_meta(url)
+        body = self.load_body(url) if meta else None
+
+        if body is not None and meta.get('expires', 0) > time.time():
+            self.touch(url)
+            metrics.increment('http_cache_total', result='fresh')
+            return self.build_response(url, meta, body)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if body is not None:
+            headers.update(self.conditional_headers(meta))
+
+        if before_request is not None:
+            before_request()
+        response = http_session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and body is not None:
+            meta['expires'] = time.time() + get_max_age(response.headers)
+            self.save_meta(url, meta)
+            self.touch(url)
+            metrics.increment('http_cache_total', result='revalidated')
+            return self.build_response(url, meta, body)
+
+        metrics.increment('http_cache_total', result='miss')
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def get_validators(self, url):
+        """Conditional request headers for a URL whose body lives elsewhere"""
+        meta = self.load_meta(url)
+        return (self.conditional_headers(meta), meta) if meta else ({}, None)
+
+    def store_validators(self, url, response_headers, **extra):
+        """Remember validators for a URL without keeping its body"""
+        meta = self.make_meta(url, response_headers)
+        if meta:
+            meta.update(extra)
+            self.save_meta(url, meta)
+
+    def make_meta(self, url, response_headers):
+        directives = parse_cache_control(response_headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return None
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        max_age = get_max_age(response_headers)
+        if not etag and not last_modified and not max_age:
+            return None
+        return {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires': time.time() + max_age,
+            'headers': {k: v for k, v in response_headers.items()
+                        if k.lower() not in SKIPPED_HEADERS}
+        }
+
+    def store(self, url, response):
+        meta = self.make_meta(url, response.headers)
+        if not meta:
+            return
+        body = response.content
+        if len(body) > self.max_bytes // 4:
+            return
+
+        body_path = self.path_for(url, '.body')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            old_size = body_path.stat().st_size if body_path.exists() else 0
+            self.write_atomic(body_path, body)
+            self.save_meta(url, meta)
+        except OSError as e:
+            print(f"Error writing HTTP cache: {str(e)}")
+            return
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self.scan_size()
+            else:
+                self.total_bytes += len(body) - old_size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        # Called with the lock held; drops least recently used bodies until
+        # the cache is back under 90% of its budget
+        entries = []
+        for body_path in self.directory.glob('*.body'):
+            try:
+                stat = body_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path))
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        for _, size, body_path in entries:
+            if self.total_bytes <= target:
+                break
+            for path in (body_path, body_path.with_suffix('.json')):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.total_bytes -= size
+
+    def scan_size(self):
+        total = 0
+        for body_path in self.directory.glob('*.body'):
+            try:
+                total += body_path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def build_response(self, url, meta, body):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def path_for(self, url, suffix):
+        return self.directory / (hashlib.sha1(url.encode('utf-8')).hexdigest() + suffix)
+
+    def load_meta(self, url):
+        try:
+            with open(self.path_for(url, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_meta(self, url, meta):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.write_atomic(self.path_for(url, '.json'), json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            print(f"Error writing HTTP cache: {str(e)}")
+
+    def load_body(self, url):
+        try:
+            with open(self.path_for(url, '.body'), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def touch(self, url):
+        try:
+            os.utime(self.path_for(url, '.body'))
+        except OSError:
+            pass
+
+    def write_atomic(self, path, data):
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache():
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache()
+        return _http_cache
+
+def cached_get(url, **kwargs):
+    return get_http_cache().get(url, **kwargs)
@@ -0,0 +1,107 @@
+import random
+import threading
+import time
+
+import metrics
+
+USER_AGENT = "DDPApps-Store"
+
+settings = {
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'pool_connections': 4,   # distinct hosts kept in the pool manager
+    # Idle connections kept per host: 3 downloads x 4 ranges, 4 image
+    # workers and 8 metadata fetchers can all hit the same raw host
+    'pool_maxsize': 24,
+    'retries': 3,
+    'backoff_factor': 0.5,
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def create_session():
+    # requests takes a noticeable share of startup, so it is only imported
+    # once the first request goes out
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class JitteredRetry(Retry):
+        """Retry whose exponential backoff is spread out by a random jitter"""
+
+        def get_backoff_time(self):
+            backoff = super().get_backoff_time()
+            if backoff <= 0:
+                return backoff
+            return backoff + random.uniform(0, self.backoff_factor)
+
+    retry = JitteredRetry(
+        total=settings['retries'],
+        backoff_factor=settings['backoff_factor'],
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    # The pool does not block: past pool_maxsize an extra connection is
+    # opened and discarded afterwards, so a large install can never stall
+    # logo and metadata requests waiting for a free slot
+    adapter = HTTPAdapter(
+        pool_connections=settings['pool_connections'],
+        pool_maxsize=settings['pool_maxsize'],
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+def get_session():
+    """Process-wide session shared by every thread"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def configure(**overrides):
+    """Change pool, retry or timeout settings; the session is rebuilt lazily"""
+    global _session
+    unknown = set(overrides) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown HTTP settings: {', '.join(sorted(unknown))}")
+    with _session_lock:
+        settings.update(overrides)
+        # Not closed: other threads may still be streaming through the old
+        # session, which is garbage collected once they let go of it
+        _session = None
+
+def request(method, url, **kwargs):
+    kwargs.setdefault('timeout', (settings['connect_timeout'], settings['read_timeout']))
+    endpoint = metrics.endpoint_class(url)
+    start = time.perf_counter()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except Exception:
+        metrics.increment('http_requests_total', endpoint=endpoint, status='error')
+        raise
+    # Time to the whole body, or to the headers for streamed downloads
+    metrics.observe('http_request_seconds', time.perf_counter() - start, endpoint=endpoint)
+    metrics.increment('http_requests_total', endpoint=endpoint,
+                      status=str(response.status_code))
+    if method != 'HEAD':
+        size = response.headers.get('Content-Length')
+        if size is None and not kwargs.get('stream'):
+            size = len(response.content)
+        if size:
+            metrics.increment('http_response_bytes_total', int(size), endpoint=endpoint)
+    return response
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
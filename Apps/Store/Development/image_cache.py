@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+
+from catalog import git_blob_sha
+from paths import get_cache_dir
+
+class PixmapCache:
+    """In-memory LRU of scaled pixmaps, bounded by their decoded size.
+
+    Keys are (blob SHA or URL, width, height). Only used from the GUI
+    thread, so it needs no locking.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def contains(self, key):
+        return key in self.entries
+
+    def put(self, key, pixmap):
+        cost = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        if cost > self.max_bytes:
+            return
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (pixmap, cost)
+        self.total_bytes += cost
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_cost) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_cost
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self.entries), 'bytes': self.total_bytes}
+
+class ImageDiskCache:
+    """Original image bytes stored under their git blob SHA.
+
+    Entries are immutable, so a hit never needs revalidation. Scaled
+    copies of large images sit next to the original with the size they
+    were decoded at appended. Least recently used files are removed once
+    the cache exceeds max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory or (get_cache_dir() / 'images')
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, sha):
+        return self.directory / sha[:2] / sha[2:]
+
+    def get(self, sha):
+        return self.read(self.path_for(sha))
+
+    def read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, data):
+        sha = git_blob_sha(data)
+        self.write(self.path_for(sha), data)
+        return sha
+
+    def scaled_path_for(self, sha, size):
+        path = self.path_for(sha)
+        return path.with_name(f"{path.name}-{size[0]}x{size[1]}")
+
+    def get_scaled(self, sha, size):
+        """A copy of blob sha decoded before at size, re-encoded small"""
+        return self.read(self.scaled_path_for(sha, size))
+
+    def put_scaled(self, sha, size, data):
+        self.write(self.scaled_path_for(sha, size), data)
+
+    def write(self, path, data):
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing image cache: {str(e)}")
+            return
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self.list_entries())
+            else:
+                self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def list_entries(self):
+        entries = []
+        for path in self.directory.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        # Called with the lock held
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(self.list_entries()):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'bytes': self.total_bytes or 0}
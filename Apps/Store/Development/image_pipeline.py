@@ -0,0 +1,236 @@
+import itertools
+import queue
+import threading
+import time
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader, QPixmap
+
+import http_session
+import metrics
+from http_cache import cached_get
+from image_cache import ImageDiskCache, PixmapCache
+
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+LOW_PRIORITY = 2
+
+# Images at least this large also get a scaled copy in the disk cache
+# for every size they are shown at
+SCALED_COPY_MIN_BYTES = 256 * 1024
+
+class ImageRequest:
+    def __init__(self, url, callback, priority, size=None, error_callback=None):
+        self.url = url
+        self.callback = callback
+        self.error_callback = error_callback  # called with no arguments on failure
+        self.priority = priority
+        self.size = size  # (width, height) to decode at, None for full size
+        self.cancelled = False
+        self.requeued = False
+
+def decode_image(data, size=None):
+    """Decode image bytes into a QImage that fits within size.
+
+    Safe to call from worker threads. QImageReader scales while decoding,
+    so a full-resolution copy is never kept around.
+    """
+    start = time.perf_counter()
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    if size:
+        original = reader.size()
+        if original.isValid():
+            reader.setScaledSize(original.scaled(QSize(*size), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    metrics.observe('image_decode_seconds', time.perf_counter() - start,
+                    kind='scaled' if size else 'full')
+    return image
+
+def encode_image(image):
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'PNG')
+    return bytes(buffer.data())
+
+class ImagePipeline(QObject):
+    """Shared image loader backed by a small fixed pool of worker threads.
+
+    Requests are served in priority order, duplicate requests for the same
+    URL share one download, and a request is dropped when its owner widget
+    is destroyed. Workers decode straight to each requested size and the
+    GUI thread only receives ready-to-display QImages via its callbacks.
+
+    Images with a known blob SHA are read from the disk cache before the
+    network is tried; scaled results live in memory_cache. A request with
+    no size gets the image at full resolution. When an image can not be
+    fetched or decoded, error_callback is called instead of callback.
+    """
+    images_ready = pyqtSignal(str, object)
+
+    def __init__(self, workers=4, parent=None):
+        super().__init__(parent)
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.pending = {}  # url -> [ImageRequest] waiting for that URL
+        self.in_flight = set()
+        self.blob_shas = {}
+        self.network_fetches = 0
+        self.memory_cache = PixmapCache()
+        self.disk_cache = ImageDiskCache()
+        self.images_ready.connect(self.deliver)
+
+        self.workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self.work, name=f"ImageWorker-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def load(self, url, callback, owner=None, priority=NORMAL_PRIORITY, blob_sha=None,
+             size=None, error_callback=None):
+        request = ImageRequest(url, callback, priority, size, error_callback)
+        with self.lock:
+            if blob_sha:
+                self.blob_shas[url] = blob_sha
+            self.enqueue(request)
+
+        if owner is not None:
+            owner.destroyed.connect(lambda *args: self.cancel(request))
+        return request
+
+    def enqueue(self, request):
+        # Called with the lock held
+        url = request.url
+        waiting = self.pending.setdefault(url, [])
+        best = min((r.priority for r in waiting), default=None)
+        waiting.append(request)
+        # Queue the URL again if this request outranks the ones already
+        # waiting; the stale lower-priority entry is skipped later
+        if url not in self.in_flight and (best is None or request.priority < best):
+            self.queue.put((request.priority, next(self.counter), url))
+
+    def cancel(self, request):
+        with self.lock:
+            request.cancelled = True
+            waiting = self.pending.get(request.url)
+            if waiting and request in waiting:
+                waiting.remove(request)
+                if not waiting:
+                    del self.pending[request.url]
+
+    def work(self):
+        while True:
+            _, _, url = self.queue.get()
+            with self.lock:
+                if url not in self.pending or url in self.in_flight:
+                    continue
+                self.in_flight.add(url)
+                blob_sha = self.blob_shas.get(url)
+                sizes = {request.size for request in self.pending[url]}
+
+            # A scaled copy from an earlier run saves reading and decoding
+            # the full image
+            images = {}
+            if blob_sha:
+                for size in sizes:
+                    data = self.disk_cache.get_scaled(blob_sha, size) if size else None
+                    image = decode_image(data) if data else None
+                    if image is not None and not image.isNull():
+                        images[size] = image
+                        metrics.increment('image_loads_total', source='scaled_copy')
+
+            if len(images) < len(sizes):
+                data = self.disk_cache.get(blob_sha) if blob_sha else None
+                source = 'disk'
+                if data is None:
+                    data = self.fetch(url, blob_sha)
+                    source = 'network'
+                if data:
+                    metrics.increment('image_loads_total', source=source)
+                    with self.lock:
+                        sizes = {request.size for request in self.pending.get(url, [])}
+                    for size in sizes - images.keys():
+                        image = decode_image(data, size)
+                        if image.isNull():
+                            continue
+                        images[size] = image
+                        if blob_sha and size and len(data) >= SCALED_COPY_MIN_BYTES:
+                            self.disk_cache.put_scaled(blob_sha, size, encode_image(image))
+            self.images_ready.emit(url, images)
+
+    def fetch(self, url, blob_sha):
+        with self.lock:
+            self.network_fetches += 1
+        try:
+            # Content-addressed images go straight to the disk cache; the
+            # rest rely on HTTP revalidation
+            if blob_sha:
+                response = http_session.get(url)
+            else:
+                response = cached_get(url)
+            if response.status_code != 200:
+                return b''
+            if blob_sha:
+                self.disk_cache.put(response.content)
+            return response.content
+        except Exception as e:
+            print(f"Error loading image: {str(e)}")
+            metrics.increment('errors_total', source='image')
+            return b''
+
+    def deliver(self, url, images):
+        with self.lock:
+            self.in_flight.discard(url)
+            waiting = self.pending.pop(url, [])
+        for request in waiting:
+            if request.cancelled:
+                continue
+            image = images.get(request.size)
+            if image is not None:
+                request.callback(image)
+            elif images and not request.requeued:
+                # Asked for a new size while the decode was running
+                request.requeued = True
+                with self.lock:
+                    self.enqueue(request)
+            elif request.error_callback is not None:
+                request.error_callback()
+
+    def stats(self):
+        with self.lock:
+            network_fetches = self.network_fetches
+        return {'memory': self.memory_cache.stats(),
+                'disk': self.disk_cache.stats(),
+                'network_fetches': network_fetches}
+
+_image_pipeline = None
+
+def get_image_pipeline():
+    # Created on first use from the GUI thread so deliveries land there
+    global _image_pipeline
+    if _image_pipeline is None:
+        _image_pipeline = ImagePipeline()
+        pipeline = _image_pipeline
+        metrics.register_gauge('pixmap_cache_bytes', lambda: pipeline.memory_cache.total_bytes)
+        metrics.register_gauge('image_queue_length', pipeline.queue.qsize)
+    return _image_pipeline
+
+def load_image_into(label, url, size, priority=NORMAL_PRIORITY, blob_sha=None):
+    pipeline = get_image_pipeline()
+    target = (size.width(), size.height())
+    key = (blob_sha or url,) + target
+    pixmap = pipeline.memory_cache.get(key)
+    if pixmap is not None:
+        label.setPixmap(pixmap)
+        metrics.increment('image_loads_total', source='memory')
+        return None
+
+    def show(image):
+        pixmap = QPixmap.fromImage(image)
+        pipeline.memory_cache.put(key, pixmap)
+        label.setPixmap(pixmap)
+    return pipeline.load(url, show, owner=label, priority=priority, blob_sha=blob_sha,
+                         size=target)
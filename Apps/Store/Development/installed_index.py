@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from paths import get_cache_dir, get_data_dir
+
+INDEX_VERSION = 1
+
+# How long a scan of the system's installed programs is trusted
+SYSTEM_SCAN_TTL = 24 * 60 * 60
+
+def get_system_scanner():
+    """Platform scan of programs installed outside the store, if any"""
+    if sys.platform == 'win32':
+        from utils import get_installed_apps
+        return get_installed_apps
+    if sys.platform.startswith('linux'):
+        from utils import get_desktop_entry_apps
+        return get_desktop_entry_apps
+    return None
+
+class InstalledIndex:
+    """What DDPApps installed, kept in one small JSON file.
+
+    Every install records the app's version, blob SHAs of its package
+    files and its directory, keyed by folder name, so is_installed is a
+    dict lookup for each card. Programs installed by other means come from
+    a cached scan of the system (the Windows Uninstall registry or
+    freedesktop .desktop entries), which is only redone in the background
+    once the cached copy is a day old. A name alone is not enough to claim
+    such a program for a catalog app; see is_system_app.
+    """
+
+    def __init__(self, path=None, system_cache_path=None, scanner=None):
+        self.path = path or (get_data_dir() / 'installed.json')
+        self.system_cache_path = system_cache_path or (get_cache_dir() / 'system_apps.json')
+        self.scanner = scanner if scanner is not None else get_system_scanner()
+        self.lock = threading.Lock()
+        self.apps = self.load()
+        self.system_apps = []
+        self.system_lookup = {}
+        system_apps, self.system_scanned_at = self.load_system_apps()
+        self.set_system_apps(system_apps)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('apps', {})
+
+    def save(self):
+        # Called with the lock held
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'apps': self.apps}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving installed apps: {str(e)}")
+
+    def is_installed(self, app_data):
+        folder_name = app_data.get('folder_name')
+        if folder_name in self.apps:
+            return True
+        candidates = self.system_lookup.get(app_data.get('name', '').lower(), []) + \
+            self.system_lookup.get(folder_name, [])
+        return any(is_system_app(entry, app_data) for entry in candidates)
+
+    def get(self, app_data):
+        return self.apps.get(app_data.get('folder_name'))
+
+    def installed_files(self, app_data):
+        """Blob SHA of every installed package file, by file name"""
+        record = self.get(app_data)
+        return dict(record['files']) if record else {}
+
+    def referenced_shas(self):
+        """Blob SHAs of the files of every installed app"""
+        with self.lock:
+            return {sha for record in self.apps.values()
+                    for sha in record.get('files', {}).values() if sha}
+
+    def record_install(self, app_data, directory):
+        record = {
+            'name': app_data.get('name', ''),
+            'app_path': app_data.get('app_path', ''),
+            'version': (app_data.get('extra') or {}).get('Version'),
+            'directory': str(directory),
+            'files': {f['name']: f.get('sha') for f in app_data.get('package_files', [])},
+            'installed_at': time.time()
+        }
+        with self.lock:
+            self.apps[app_data.get('folder_name')] = record
+            self.save()
+
+    def record_uninstall(self, app_data):
+        with self.lock:
+            if self.apps.pop(app_data.get('folder_name'), None) is not None:
+                self.save()
+        # The cached scan may still list what was just removed
+        system_apps = [entry for entry in self.system_apps
+                       if not is_system_app(entry, app_data)]
+        if len(system_apps) != len(self.system_apps):
+            self.set_system_apps(system_apps)
+            self.save_system_apps()
+
+    def load_system_apps(self):
+        try:
+            with open(self.system_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data['apps'], data['scanned_at']
+        except (OSError, ValueError, KeyError):
+            return [], 0
+
+    def save_system_apps(self):
+        try:
+            self.system_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.system_cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'scanned_at': self.system_scanned_at, 'apps': self.system_apps}, f)
+            os.replace(tmp_path, self.system_cache_path)
+        except OSError as e:
+            print(f"Error saving installed programs: {str(e)}")
+
+    def set_system_apps(self, system_apps):
+        # Looked up by name, lowercased name and install folder; swapped
+        # in whole so readers never see a half-built dict
+        lookup = {}
+        for entry in system_apps:
+            keys = {entry.get('name', ''), entry.get('name', '').lower()}
+            if entry.get('install_dir'):
+                keys.add(os.path.basename(os.path.normpath(entry['install_dir'])))
+            for key in keys:
+                lookup.setdefault(key, []).append(entry)
+        self.system_apps = system_apps
+        self.system_lookup = lookup
+
+    def system_scan_due(self):
+        return self.scanner is not None and \
+            time.time() - self.system_scanned_at > SYSTEM_SCAN_TTL
+
+    def refresh_system_apps(self, force=False):
+        """Rescan the system if the cached scan is stale; slow on Windows,
+        so run it off the GUI thread. Returns True if anything changed."""
+        if not force and not self.system_scan_due():
+            return False
+        if self.scanner is None:
+            return False
+        try:
+            system_apps = sorted((entry for entry in self.scanner() if entry.get('name')),
+                                 key=lambda entry: entry['name'].lower())
+        except Exception as e:
+            print(f"Error scanning installed programs: {str(e)}")
+            return False
+
+        changed = system_apps != self.system_apps
+        self.set_system_apps(system_apps)
+        self.system_scanned_at = time.time()
+        self.save_system_apps()
+        return changed
+
+def is_system_app(entry, app_data):
+    """Whether a program found by the system scan is this catalog app.
+
+    It has to sit in the directory DDPApps installs the app to (and that
+    directory has to still exist), in a folder named exactly like the
+    app's folder, be named exactly like that folder, or have the app's
+    name and the publisher its extra.txt lists.
+    """
+    folder_name = app_data.get('folder_name')
+    install_dir = entry.get('install_dir')
+    if folder_name and install_dir:
+        install_dir = os.path.normpath(install_dir)
+        if install_dir == os.path.normpath(get_data_dir() / folder_name):
+            return os.path.isdir(install_dir)
+        if os.path.basename(install_dir) == folder_name:
+            return True
+    if folder_name and entry.get('name') == folder_name:
+        return True
+
+    extra = app_data.get('extra') or {}
+    publisher = extra.get('Publisher') or extra.get('Author')
+    return bool(publisher and entry.get('publisher')) and \
+        entry['publisher'].lower() == publisher.lower() and \
+        entry.get('name', '').lower() == app_data.get('name', '').lower()
+
+_installed_index = None
+
+def get_installed_index():
+    global _installed_index
+    if _installed_index is None:
+        _installed_index = InstalledIndex()
+    return _installed_index
@@ -0,0 +1,292 @@
+import os
+import shutil
+import threading
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from delta import MAX_DELTA_RATIO, SHA_PREFIX, apply_delta, find_delta_chain
+from download_manager import NORMAL_PRIORITY, get_download_manager
+from installed_index import get_installed_index
+from package_store import ContentHasher, get_package_store
+from paths import get_cache_dir, get_data_dir
+
+# Headroom kept free on top of the package size
+FREE_SPACE_MARGIN = 50 * 1024 * 1024
+
+class InstallError(Exception):
+    pass
+
+def get_app_dir(app_data):
+    return get_data_dir() / app_data.get('folder_name', 'unknown_app')
+
+def check_free_space(directory, required):
+    free = shutil.disk_usage(directory).free
+    if free < required + FREE_SPACE_MARGIN:
+        raise InstallError(
+            f"Not enough disk space: {format_size(required)} needed, "
+            f"{format_size(free)} available.")
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+class DeltaUpdate:
+    """A package file being rebuilt from its installed version"""
+
+    def __init__(self, package_file, source, chain):
+        self.package_file = package_file
+        self.source = source
+        self.chain = chain
+        self.paths = []
+        self.job_ids = []
+        self.waiting = set()
+        self.abandoned = False
+
+class AppInstall(QObject):
+    """Downloads every package file of an app through the download manager.
+
+    All files are queued at once and run under the manager's concurrency
+    caps. Progress is the byte total across files, using the sizes from
+    the catalog until the server reports real ones. finished is emitted
+    once every file has arrived; if one file fails the rest are cancelled.
+
+    Files with a known blob SHA are downloaded into the package store,
+    verified, and hardlinked into the app directory. Files the store
+    already holds are linked without downloading them again.
+
+    When an older version of a file is installed and the catalog lists
+    deltas leading to the new one, only the deltas are downloaded and the
+    file is patched and verified off the GUI thread. Any problem with
+    that path falls back to the full download.
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    patched = pyqtSignal(object, str)
+
+    def __init__(self, app_data, priority=NORMAL_PRIORITY, parent=None):
+        super().__init__(parent)
+        self.app_data = app_data
+        self.priority = priority
+        self.app_dir = get_app_dir(app_data)
+        self.jobs = []
+        self.done = {}
+        self.totals = {}
+        self.remaining = 0
+        self.error = None
+        self.cancelled = False
+        self.pinned = []
+        self.patched.connect(self.on_patched)
+
+    def start(self):
+        """Queue the downloads; raises InstallError if they can not fit"""
+        package_files = self.app_data.get('package_files') or []
+        if not package_files:
+            raise InstallError("No installable files available.")
+        self.app_dir.mkdir(parents=True, exist_ok=True)
+
+        store = get_package_store()
+        stored = [f for f in package_files
+                  if f.get('sha') and store.contains(f['sha'], f.get('size'))]
+        missing = [f for f in package_files if f not in stored]
+        check_free_space(self.app_dir, sum(f.get('size', 0) for f in missing))
+
+        # Objects linked or written before the install is recorded must
+        # survive a collect_garbage in the meantime
+        self.pinned = [f['sha'] for f in package_files if f.get('sha')]
+        store.pin(self.pinned)
+        for package_file in stored:
+            store.link(package_file['sha'], self.destination(package_file))
+
+        installed = get_installed_index().installed_files(self.app_data)
+        self.remaining = len(missing)
+        for package_file in missing:
+            update = self.plan_delta(package_file, installed.get(package_file['name']))
+            if update:
+                self.start_delta(update)
+            else:
+                self.start_download(package_file)
+        self.progress.emit(0, self.total_size())
+        if not missing:
+            # Let the caller connect to finished first
+            QTimer.singleShot(0, self.complete)
+
+    def plan_delta(self, package_file, installed_sha):
+        sha = package_file.get('sha')
+        deltas = self.app_data.get('deltas')
+        if not (sha and installed_sha and deltas) or installed_sha == sha:
+            return None
+        store = get_package_store()
+        if store.contains(installed_sha):
+            source = store.path_for(installed_sha)
+        else:
+            source = self.destination(package_file)
+            if not source.exists():
+                return None
+        max_size = package_file.get('size', 0) * MAX_DELTA_RATIO
+        chain = find_delta_chain(deltas, package_file['name'], installed_sha, sha, max_size)
+        return DeltaUpdate(package_file, source, chain) if chain else None
+
+    def enqueue(self, url, target, size, hasher):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        job = get_download_manager().enqueue(url, target, self.priority, size=size,
+                                             hasher=hasher)
+        self.totals[job.job_id] = size
+        self.done[job.job_id] = 0
+        job.progress.connect(lambda done, total, job_id=job.job_id:
+                             self.on_job_progress(job_id, done, total))
+        self.jobs.append(job)
+        return job
+
+    def start_download(self, package_file):
+        destination = self.destination(package_file)
+        sha = package_file.get('sha')
+        if sha:
+            target = get_package_store().path_for(sha)
+            hasher = ContentHasher(sha, package_file.get('sha256'), package_file['name'])
+        else:
+            target = destination
+            hasher = None
+        job = self.enqueue(package_file['download_url'], target,
+                           package_file.get('size', 0), hasher)
+        job.finished.connect(lambda path: self.on_job_finished(sha, destination))
+        job.failed.connect(self.on_job_failed)
+
+    def start_delta(self, update):
+        delta_dir = get_cache_dir() / 'deltas'
+        for delta in update.chain:
+            path = delta_dir / delta['name']
+            job = self.enqueue(delta['download_url'], path, delta.get('size', 0),
+                               ContentHasher(delta.get('sha'), name=delta['name']))
+            update.paths.append(path)
+            update.job_ids.append(job.job_id)
+            update.waiting.add(job.job_id)
+            job.finished.connect(lambda path, job_id=job.job_id:
+                                 self.on_delta_downloaded(update, job_id))
+            job.failed.connect(lambda error: self.on_delta_failed(update, error))
+
+    def on_delta_downloaded(self, update, job_id):
+        update.waiting.discard(job_id)
+        if update.waiting or update.abandoned or self.error is not None:
+            return
+        threading.Thread(target=self.apply_deltas, args=(update,), daemon=True).start()
+
+    def apply_deltas(self, update):
+        # Runs on a worker thread; the result goes back through patched
+        package_file = update.package_file
+        target = get_package_store().path_for(package_file['sha'])
+        source = update.source
+        outputs = []
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            for i, (delta, path) in enumerate(zip(update.chain, update.paths)):
+                output = target.with_name(f"{target.name}.patch{i}")
+                outputs.append(output)
+                if i == len(update.chain) - 1:
+                    hasher = ContentHasher(package_file['sha'], package_file.get('sha256'),
+                                           package_file['name'])
+                    apply_delta(source, path.read_bytes(), output, hasher)
+                    hasher.verify(output)
+                else:
+                    hasher = ContentHasher()
+                    apply_delta(source, path.read_bytes(), output, hasher)
+                    if not hasher.git.hexdigest().startswith(delta['to'][:SHA_PREFIX]):
+                        raise IOError(f"Checksum mismatch after {delta['name']}")
+                source = output
+            os.replace(outputs[-1], target)
+            self.patched.emit(update, '')
+        except Exception as e:
+            self.patched.emit(update, str(e))
+        finally:
+            for path in outputs + update.paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def on_patched(self, update, error):
+        if self.error is not None:
+            return
+        if error:
+            self.fall_back(update, error)
+            return
+        package_file = update.package_file
+        self.on_job_finished(package_file['sha'], self.destination(package_file))
+
+    def on_delta_failed(self, update, error):
+        if self.cancelled:
+            self.on_job_failed(error)
+        elif not update.abandoned:
+            self.fall_back(update, error)
+
+    def fall_back(self, update, error):
+        update.abandoned = True
+        manager = get_download_manager()
+        for job in [job for job in self.jobs if job.job_id in update.waiting]:
+            # The other deltas of the chain are no longer needed
+            self.jobs.remove(job)
+            manager.cancel(job)
+        for job_id in update.job_ids:
+            self.totals.pop(job_id, None)
+            self.done.pop(job_id, None)
+        print(f"Delta update of {update.package_file['name']} failed, "
+              f"downloading the full file: {error}")
+        self.start_download(update.package_file)
+
+    def destination(self, package_file):
+        return self.app_dir / package_file['name']
+
+    def main_file(self):
+        return str(self.destination(self.app_data['package_files'][0]))
+
+    def total_size(self):
+        return sum(self.totals.values())
+
+    def cancel(self):
+        self.cancelled = True
+        manager = get_download_manager()
+        for job in self.jobs:
+            manager.cancel(job)
+
+    def on_job_progress(self, job_id, done, total):
+        if job_id not in self.done:
+            return
+        self.done[job_id] = done
+        if total:
+            self.totals[job_id] = total
+        self.progress.emit(sum(self.done.values()), self.total_size())
+
+    def on_job_finished(self, sha, destination):
+        # A job shared with another install may finish after this one
+        # was cancelled
+        if self.error is not None or self.cancelled:
+            return
+        if sha:
+            try:
+                get_package_store().link(sha, destination)
+            except OSError as e:
+                self.on_job_failed(f"Could not install {destination.name}: {str(e)}")
+                return
+        self.remaining -= 1
+        if self.remaining == 0 and self.error is None:
+            self.complete()
+
+    def release(self):
+        get_package_store().unpin(self.pinned)
+        self.pinned = []
+
+    def complete(self):
+        get_installed_index().record_install(self.app_data, self.app_dir)
+        self.release()
+        self.app_data['is_installed'] = True
+        self.finished.emit(self.main_file())
+
+    def on_job_failed(self, error):
+        self.remaining -= 1
+        if self.error is None:
+            self.error = error
+            self.cancel()
+            self.release()
+            self.failed.emit(error)
@@ -1,132 +1,238 @@
 import sys
-import os
-import json
-import requests
-import shutil
-import base64
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QScrollArea, QLabel, QPushButton, 
-                            QFrame, QGridLayout, QMessageBox, QProgressBar,
-                            QStackedWidget)
-from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
-from PyQt6.QtGui import QPixmap, QIcon, QDesktopServices, QFont
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
-from app_card import AppCard
-from app_detail_view import AppDetailView
-from utils import get_installed_apps
+                            QHBoxLayout, QLabel, QPushButton, QMessageBox,
+                            QProgressBar, QStackedWidget, QListView, QLineEdit)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QCursor, QKeySequence, QShortcut
+import metrics
+from app_grid import APP_DATA_ROLE, AppCardDelegate, AppListModel
+from http_cache import cached_get
+from github_api import HIGH_PRIORITY, NORMAL_PRIORITY, RateLimitExceeded, get_github_api
+from catalog_cache import load_cached_catalog, save_catalog
+from search_index import SearchIndex
+from view_cache import DetailViewCache
+from installed_index import get_installed_index
+from catalog import (API_URL, APPS_ROOT, BRANCH, CATALOG_URL, CATALOG_VERSION,
+                     INFO_FILES, apply_image_file, apply_info_file,
+                     build_apps_from_tree, new_app_data, parse_extra_file)
 
 class GitHubFetcher(QThread):
     app_data_ready = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     finished_loading = pyqtSignal()
+    rate_limited = pyqtSignal(float, list)
     
-    def __init__(self, repo_url):
+    def __init__(self, repo_url, max_workers=8, ordered=True, known_apps=None,
+                 priority_apps=None):
         super().__init__()
         self.repo_url = repo_url
-        self.api_url = "https://api.github.com/repos/WeXetProgram/ddpapps/contents/Apps"
+        # app_path -> app_data already shown; unchanged apps are reused as is
+        self.known_apps = known_apps or {}
+        # Apps on screen are fetched first when the API budget runs low
+        self.priority_apps = set(priority_apps or ())
+        self.github_api = get_github_api()
+        self.max_workers = max_workers
+        self.ordered = ordered  # Keep catalog order in the grid
+        self.api_url = f"{API_URL}/contents/{APPS_ROOT}"
+        self.tree_url = f"{API_URL}/git/trees/{BRANCH}?recursive=1"
+        self.catalog_url = CATALOG_URL
         self.is_running = True
+        self.failed_apps = []
+        # Apps skipped because the API budget ran out, retried after reset
+        self.pending_apps = []
+        self.rate_limit_reset = None
         
     def run(self):
         try:
-            response = requests.get(self.api_url)
-            if response.status_code == 200:
-                apps = response.json()
-                for app in apps:
-                    if not self.is_running:
-                        return
-                    if app['type'] == 'dir':
-                        self.fetch_app_data(app['path'])
+            # Prefer the prebuilt catalog.json, then one recursive tree
+            # request; the per-directory crawl is the last resort.
+            start = time.perf_counter()
+            if self.load_from_index():
+                source = 'catalog'
+            elif self.load_from_tree():
+                source = 'tree'
             else:
-                self.error_occurred.emit(f"Failed to fetch apps: {response.status_code}")
+                self.crawl_contents()
+                source = 'contents'
+            metrics.observe('catalog_fetch_seconds', time.perf_counter() - start, source=source)
+        except RateLimitExceeded as e:
+            self.rate_limit_reset = e.reset_time
         except Exception as e:
             self.error_occurred.emit(f"Error fetching apps: {str(e)}")
         finally:
+            if self.rate_limit_reset is not None:
+                self.rate_limited.emit(self.rate_limit_reset, self.pending_apps)
             self.finished_loading.emit()
             
-    def fetch_app_data(self, app_path):
+    def load_from_index(self):
+        # Already loaded by the first request; kept out of startup
+        from requests import RequestException
+        try:
+            response = cached_get(self.catalog_url)
+            if response.status_code != 200:
+                return False
+            catalog = response.json()
+        except (RequestException, ValueError):
+            # Fall back to the tree or the crawl
+            return False
+        if catalog.get('version') != CATALOG_VERSION:
+            return False
+            
+        for app_data in catalog.get('apps', []):
+            if not self.is_running:
+                break
+            self.app_data_ready.emit(app_data)
+        return True
+        
+    def load_from_tree(self):
+        response = self.github_api.get(self.tree_url, HIGH_PRIORITY)
+        if response.status_code != 200:
+            return False
+        tree = response.json()
+        if tree.get('truncated'):
+            return False
+            
+        jobs = []
+        for app_data, info_urls in build_apps_from_tree(tree.get('tree', [])):
+            known = self.known_apps.get(app_data['app_path'])
+            if known and self.is_unchanged(known, app_data):
+                jobs.append(lambda known=known, app_data=app_data:
+                            dict(known, tree_sha=app_data['tree_sha']))
+            else:
+                jobs.append(lambda app_data=app_data, info_urls=info_urls:
+                            self.fetch_info_files(app_data, info_urls))
+        self.fetch_concurrently(jobs)
+        return True
+        
+    def is_unchanged(self, known, app_data):
+        # Same app directory tree, or at least the same Info/Images/Package
+        # blobs (entries from catalog.json carry no tree SHA)
+        if known.get('tree_sha') == app_data['tree_sha']:
+            return True
+        return known.get('blob_shas') == app_data['blob_shas']
+        
+    def crawl_contents(self):
+        response = self.github_api.get(self.api_url, HIGH_PRIORITY)
+        if response.status_code == 200:
+            apps = [app['path'] for app in response.json() if app['type'] == 'dir']
+            first = [index for index, app_path in enumerate(apps)
+                     if app_path in self.priority_apps]
+            self.fetch_concurrently(
+                [lambda app_path=app_path: self.fetch_app_data(app_path) for app_path in apps],
+                first)
+        else:
+            self.error_occurred.emit(f"Failed to fetch apps: {response.status_code}")
+            
+    def fetch_concurrently(self, jobs, first=()):
+        # Each job returns an app_data dict or None. Results are emitted as
+        # they arrive; in ordered mode a result waits until every earlier
+        # job has finished so cards keep their catalog position. Jobs whose
+        # indexes are in first are started before the rest.
+        results = {}
+        next_index = 0
+        first_set = set(first)
+        order = list(first) + [index for index in range(len(jobs)) if index not in first_set]
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {executor.submit(jobs[index]): index for index in order}
+            for future in as_completed(futures):
+                if not self.is_running:
+                    return
+                app_data = future.result()
+                if not self.ordered:
+                    if app_data:
+                        self.app_data_ready.emit(app_data)
+                    continue
+                    
+                results[futures[future]] = app_data
+                while next_index in results:
+                    app_data = results.pop(next_index)
+                    next_index += 1
+                    if app_data:
+                        self.app_data_ready.emit(app_data)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            
+    def fetch_info_files(self, app_data, info_urls):
         if not self.is_running:
-            return
+            return None
             
         try:
-            app_data = {
-                'name': 'Unknown App',
-                'description': '',
-                'logo_path': '',
-                'screenshots': [],
-                'package_files': [],
-                'is_installed': False,
-                'app_path': app_path
-            }
+            for file_name, url in info_urls.items():
+                apply_info_file(app_data, file_name, cached_get(url).text)
+            return app_data
+        except Exception as e:
+            self.failed_apps.append(app_data['app_path'])
+            print(f"Error fetching app data for {app_data['app_path']}: {str(e)}")
+            metrics.increment('errors_total', source='fetch_app')
+            return None
             
-            # Get app name from path
-            app_folder_name = app_path.split('/')[-1]
-            app_data['folder_name'] = app_folder_name
+    def fetch_app_data(self, app_path):
+        if not self.is_running:
+            return None
+            
+        priority = HIGH_PRIORITY if app_path in self.priority_apps else NORMAL_PRIORITY
+        try:
+            app_data = new_app_data(app_path)
             
             # Fetch Info directory contents
             info_path = f"{app_path}/Info"
-            info_response = requests.get(f"https://api.github.com/repos/WeXetProgram/ddpapps/contents/{info_path}")
+            info_response = self.github_api.get(f"{API_URL}/contents/{info_path}", priority)
             if info_response.status_code == 200:
                 info_files = info_response.json()
                 for file in info_files:
-                    if file['name'].lower() == 'name.txt':
-                        content = requests.get(file['download_url']).text
-                        app_data['name'] = content.strip()
-                    elif file['name'].lower() == 'description.txt':
-                        content = requests.get(file['download_url']).text
-                        app_data['description'] = content.strip()
-                    elif file['name'].lower() == 'extra.txt':
-                        content = requests.get(file['download_url']).text
-                        app_data['extra'] = self.parse_extra_file(content)
+                    app_data['blob_shas'][file['download_url']] = file['sha']
+                    if file['name'].lower() in INFO_FILES:
+                        content = cached_get(file['download_url']).text
+                        apply_info_file(app_data, file['name'], content)
             
             # Fetch Images directory contents
             images_path = f"{app_path}/Images"
-            images_response = requests.get(f"https://api.github.com/repos/WeXetProgram/ddpapps/contents/{images_path}")
+            images_response = self.github_api.get(f"{API_URL}/contents/{images_path}", priority)
             if images_response.status_code == 200:
                 image_files = images_response.json()
                 for file in image_files:
-                    if file['name'].lower() == 'logo.png':
-                        app_data['logo_path'] = file['download_url']
-                    elif file['name'].lower() == 'banner.png':
-                        app_data['banner_path'] = file['download_url']
-                    elif file['name'].lower().startswith('screen') and file['name'].lower().endswith('.png'):
-                        app_data['screenshots'].append(file['download_url'])
+                    app_data['blob_shas'][file['download_url']] = file['sha']
+                    apply_image_file(app_data, file['name'], file['download_url'])
             
             # Fetch Package directory contents
             package_path = f"{app_path}/Package"
-            package_response = requests.get(f"https://api.github.com/repos/WeXetProgram/ddpapps/contents/{package_path}")
+            package_response = self.github_api.get(f"{API_URL}/contents/{package_path}", priority)
             if package_response.status_code == 200:
                 package_files = package_response.json()
                 for file in package_files:
+                    app_data['blob_shas'][file['download_url']] = file['sha']
                     app_data['package_files'].append({
                         'name': file['name'],
                         'download_url': file['download_url'],
-                        'size': file['size']
+                        'size': file['size'],
+                        'sha': file['sha']
                     })
             
-            self.app_data_ready.emit(app_data)
+            return app_data
             
+        except RateLimitExceeded as e:
+            self.pending_apps.append(app_path)
+            self.rate_limit_reset = e.reset_time
+            return None
         except Exception as e:
+            self.failed_apps.append(app_path)
             print(f"Error fetching app data for {app_path}: {str(e)}")
+            metrics.increment('errors_total', source='fetch_app')
+            return None
     
     def parse_extra_file(self, content):
-        result = {}
-        for line in content.splitlines():
-            if ':' in line:
-                key, value = line.split(':', 1)
-                result[key.strip()] = value.strip()
-            else:  # For lines without a colon
-                parts = line.split()
-                if len(parts) >= 2:
-                    key = parts[0]
-                    value = ' '.join(parts[1:])
-                    result[key] = value
-        return result
+        return parse_extra_file(content)
     
     def stop(self):
         self.is_running = False
 
 class AppGridView(QWidget):
+    app_clicked = pyqtSignal(dict)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
@@ -135,30 +241,121 @@ class AppGridView(QWidget):
         layout = QVBoxLayout(self)
         
         # Header
+        header_layout = QHBoxLayout()
         header = QLabel("DDP App Store")
         header.setFont(QFont("Arial", 24, QFont.Weight.Bold))
         header.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(header)
+        header_layout.addWidget(header, 1)
+        
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search apps")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedSize(250, 40)
+        header_layout.addWidget(self.search_box)
+        
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.setFixedSize(120, 40)
+        header_layout.addWidget(self.refresh_button)
+        layout.addLayout(header_layout)
         
         # Create loading indicator
         self.loading_indicator = QProgressBar()
         self.loading_indicator.setRange(0, 0)  # Indeterminate progress
         layout.addWidget(self.loading_indicator)
         
-        # Create scroll area for apps
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        # Create container for apps
-        self.apps_container = QWidget()
-        self.apps_layout = QGridLayout(self.apps_container)
-        self.apps_layout.setSpacing(20)
-        
-        scroll_area.setWidget(self.apps_container)
-        layout.addWidget(scroll_area)
+        self.empty_label = QLabel("No apps found")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.hide()
+        layout.addWidget(self.empty_label)
+        
+        # Only the visible cards are painted; columns reflow with the width
+        self.apps_model = AppListModel(self)
+        self.apps_view = QListView()
+        self.apps_view.setModel(self.apps_model)
+        self.apps_view.setItemDelegate(AppCardDelegate(self.apps_view))
+        self.apps_view.setViewMode(QListView.ViewMode.IconMode)
+        self.apps_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.apps_view.setMovement(QListView.Movement.Static)
+        self.apps_view.setUniformItemSizes(True)
+        # Lay out large result sets in steps so filtering stays responsive
+        self.apps_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.apps_view.setBatchSize(200)
+        self.apps_view.setSpacing(10)
+        self.apps_view.setMouseTracking(True)
+        self.apps_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.apps_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.apps_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.apps_view.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.apps_view.setStyleSheet("QListView { border: none; background: transparent; }")
+        self.apps_view.clicked.connect(
+            lambda index: self.app_clicked.emit(index.data(APP_DATA_ROLE)))
+        layout.addWidget(self.apps_view)
+        
+        # Logo loading follows the viewport: settle briefly after scrolling,
+        # then load what is visible and prefetch a screen ahead
+        self.last_scroll_value = 0
+        self.visible_rows = range(0)
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(50)
+        self.visible_timer.timeout.connect(self.load_visible_logos)
+        self.apps_view.verticalScrollBar().valueChanged.connect(self.visible_timer.start)
+        self.apps_model.rowsInserted.connect(self.visible_timer.start)
+        self.apps_model.rowsRemoved.connect(self.visible_timer.start)
+        self.apps_model.layoutChanged.connect(self.visible_timer.start)
+        self.apps_model.modelReset.connect(self.visible_timer.start)
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.visible_timer.start()
+        
+    def load_visible_logos(self):
+        count = self.apps_model.rowCount()
+        if not count:
+            return
+        view = self.apps_view
+        
+        # Cells share one size, so the column count and row pitch can be read
+        # off the first cells' positions
+        first_rect = view.visualRect(self.apps_model.index(0))
+        columns = 1
+        while columns < count and view.visualRect(
+                self.apps_model.index(columns)).top() == first_rect.top():
+            columns += 1
+        if count > columns:
+            pitch = view.visualRect(self.apps_model.index(columns)).top() - first_rect.top()
+        else:
+            pitch = first_rect.height()
+        pitch = max(pitch, 1)
+        
+        offset = -first_rect.top()
+        first_line = max(0, offset // pitch)
+        last_line = max(0, (offset + view.viewport().height()) // pitch)
+        screen_lines = last_line - first_line + 1
+        first = first_line * columns
+        last = min(count, (last_line + 1) * columns)
+        visible_rows = range(first, last)
+        self.visible_rows = visible_rows
+        
+        # Prefetch roughly one screen in the direction of travel
+        scroll_value = view.verticalScrollBar().value()
+        prefetch = screen_lines * columns
+        if scroll_value < self.last_scroll_value:
+            prefetch_rows = range(max(0, first - prefetch), first)
+        else:
+            prefetch_rows = range(last, min(count, last + prefetch))
+        self.last_scroll_value = scroll_value
+        
+        self.apps_model.load_visible(visible_rows, prefetch_rows)
+        
+    def visible_app_paths(self):
+        # visible_rows are view rows, so they index the filtered list
+        shown = self.apps_model.shown
+        return [shown[row]['app_path'] for row in self.visible_rows if row < len(shown)]
 
 class AppStore(QMainWindow):
+    system_apps_scanned = pyqtSignal()
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("DDP App Store")
@@ -172,103 +369,233 @@ class AppStore(QMainWindow):
         self.grid_view = AppGridView()
         self.stacked_widget.addWidget(self.grid_view)
         
-        # Initialize network manager
-        self.network_manager = QNetworkAccessManager()
-        
-        # Initialize GitHub fetcher
-        self.github_fetcher = GitHubFetcher("https://github.com/WeXetProgram/ddpapps/")
-        self.github_fetcher.app_data_ready.connect(self.add_app_card)
-        self.github_fetcher.error_occurred.connect(self.show_error)
-        self.github_fetcher.finished_loading.connect(self.on_loading_finished)
-        
-        # Initialize row and column counters
-        self.current_row = 0
-        self.current_col = 0
-        self.max_cols = 4  # Show 4 apps per row for a more grid-like appearance
-        
-        # Initialize back button for detail view
-        self.back_button = QPushButton("Back to Apps")
-        self.back_button.setFixedSize(120, 40)
-        self.back_button.clicked.connect(self.show_grid_view)
-        
-        # Load apps
-        self.load_apps()
+        self.github_fetcher = None
+        self.search_index = SearchIndex()
+        self.installed_index = get_installed_index()
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.load_apps)
+        self.apps_model = self.grid_view.apps_model
+        self.grid_view.app_clicked.connect(self.show_app_details)
+        self.grid_view.refresh_button.clicked.connect(self.load_apps)
+        self.grid_view.search_box.textChanged.connect(self.apply_search)
+        
+        # While a search is active, streamed-in apps are matched in batches
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(100)
+        self.search_timer.timeout.connect(self.apply_search)
+        
+        # Detail views stay alive for a while after going back to the grid
+        self.detail_views = DetailViewCache(self.stacked_widget)
+        metrics.register_gauge('detail_views_cached', lambda: len(self.detail_views.entries))
+        
+        # Debug panel with request, decode and paint metrics
+        self.metrics_panel = None
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, self.show_metrics_panel)
+        
+        # Show the last good catalog straight away, then revalidate it
+        # against GitHub in the background
+        cached_apps = load_cached_catalog()
+        for app_data in cached_apps:
+            app_data['is_installed'] = self.installed_index.is_installed(app_data)
+        self.apps_model.add_apps(cached_apps)
+        
+        # Everything else waits until the window is on screen: the cached
+        # apps are indexed for search in small batches between events
+        self.unindexed_paths = [app_data['app_path'] for app_data in cached_apps]
+        self.index_timer = QTimer(self)
+        self.index_timer.timeout.connect(self.index_next_batch)
+        self.index_timer.start(0)
+        QTimer.singleShot(0, self.load_apps)
+        
+        # Programs installed outside the store are found by a slow system
+        # scan; its cached result is used until a background rescan is due
+        self.system_apps_scanned.connect(self.refresh_installed_state)
+        if self.installed_index.system_scan_due():
+            QTimer.singleShot(0, lambda: threading.Thread(
+                target=self.scan_system_apps, name="SystemAppScan", daemon=True).start())
+        
+    def index_next_batch(self, batch_size=100):
+        batch = self.unindexed_paths[:batch_size]
+        del self.unindexed_paths[:batch_size]
+        for app_path in batch:
+            app_data = self.apps_model.app_data(app_path)
+            if app_data is not None and app_path not in self.search_index:
+                self.search_index.add(app_data)
+        if not self.unindexed_paths:
+            self.index_timer.stop()
+        
+    def scan_system_apps(self):
+        if self.installed_index.refresh_system_apps():
+            self.system_apps_scanned.emit()
+            
+    def refresh_installed_state(self):
+        for app_data in self.apps_model.apps:
+            is_installed = self.installed_index.is_installed(app_data)
+            if app_data.get('is_installed') != is_installed:
+                app_data['is_installed'] = is_installed
+                self.apps_model.update_app(app_data)
+        
+    def on_installed_changed(self, app_data):
+        # The grid may hold a newer copy of the app from a later refresh
+        current = self.apps_model.app_data(app_data['app_path'])
+        if current is not None:
+            current['is_installed'] = app_data['is_installed']
+            self.apps_model.update_app(current)
         
     def load_apps(self):
-        # Clear existing apps
-        for i in reversed(range(self.grid_view.apps_layout.count())): 
-            widget = self.grid_view.apps_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        
-        # Reset row and column
-        self.current_row = 0
-        self.current_col = 0
+        if self.github_fetcher and self.github_fetcher.isRunning():
+            return
+        self.retry_timer.stop()
+        self.fetched_apps = []
+        self.fetch_failed = False
         
         # Show loading indicator
         self.grid_view.loading_indicator.show()
+        self.grid_view.refresh_button.setEnabled(False)
+        
+        # A QThread only runs once, so every refresh gets a new fetcher. It
+        # is given the apps on screen and only re-fetches the changed ones.
+        known_apps = {app_data['app_path']: app_data for app_data in self.apps_model.apps}
+        self.github_fetcher = GitHubFetcher("https://github.com/WeXetProgram/ddpapps/",
+                                            known_apps=known_apps,
+                                            priority_apps=self.grid_view.visible_app_paths())
+        self.github_fetcher.app_data_ready.connect(self.on_app_data_ready)
+        self.github_fetcher.error_occurred.connect(self.show_error)
+        self.github_fetcher.rate_limited.connect(self.on_rate_limited)
+        self.github_fetcher.finished_loading.connect(self.on_loading_finished)
         
         # Start fetching apps from GitHub
         self.github_fetcher.start()
         
-    def add_app_card(self, app_data):
-        # Create app card
-        app_card = AppCard(app_data)
-        app_card.app_clicked.connect(lambda data: self.show_app_details(data))
-        
-        # Add to grid layout
-        self.grid_view.apps_layout.addWidget(app_card, self.current_row, self.current_col)
-        
-        # Update grid position
-        self.current_col += 1
-        if self.current_col >= self.max_cols:
-            self.current_col = 0
-            self.current_row += 1
+    def on_app_data_ready(self, app_data):
+        app_data['is_installed'] = self.installed_index.is_installed(app_data)
+        self.fetched_apps.append(app_data)
+        self.grid_view.empty_label.hide()
+        
+        # Only touch the grid for apps that were added or changed
+        current = self.apps_model.app_data(app_data['app_path'])
+        if current is None:
+            self.apps_model.add_app(app_data)
+        elif current != app_data:
+            self.apps_model.update_app(app_data)
+            self.detail_views.discard(app_data['app_path'])
+        else:
+            return
+        self.search_index.add(app_data)
+        if self.apps_model.is_filtered():
+            self.search_timer.start()
         
     def on_loading_finished(self):
         # Hide loading indicator
         self.grid_view.loading_indicator.hide()
-        
-        # If no apps were found, show a message
-        if self.grid_view.apps_layout.count() == 0:
-            empty_label = QLabel("No apps found")
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.grid_view.apps_layout.addWidget(empty_label, 0, 0)
+        self.grid_view.refresh_button.setEnabled(True)
+        
+        # Drop apps that no longer exist and persist the fresh catalog, unless
+        # the fetch was cut short; apps that failed to load keep their cached data
+        if not self.fetch_failed and self.github_fetcher.is_running:
+            fetched_paths = [app_data['app_path'] for app_data in self.fetched_apps]
+            fetched = set(fetched_paths)
+            skipped = set(self.github_fetcher.failed_apps) | set(self.github_fetcher.pending_apps)
+            kept_paths = [app_path for app_path in self.apps_model.app_paths()
+                          if app_path not in fetched and app_path in skipped]
+            kept = set(kept_paths)
+            removed = [app_path for app_path in self.apps_model.app_paths()
+                       if app_path not in fetched and app_path not in kept]
+            self.apps_model.remove_apps(removed)
+            for app_path in removed:
+                self.search_index.remove(app_path)
+                self.detail_views.discard(app_path)
+            
+            order = fetched_paths + kept_paths
+            if self.apps_model.app_paths() != order:
+                self.apps_model.reorder(order)
+            save_catalog(self.apps_model.apps)
+        
+        self.update_empty_label()
+        
+    def apply_search(self):
+        # Typing before the background indexing finished
+        while self.unindexed_paths:
+            self.index_next_batch()
+        matches = self.search_index.search(self.grid_view.search_box.text())
+        if matches != self.apps_model.filter_paths:
+            self.apps_model.set_filter(matches)
+        self.update_empty_label()
+        
+    def update_empty_label(self):
+        if self.apps_model.is_filtered() and not self.apps_model.rowCount():
+            self.grid_view.empty_label.setText("No apps match your search")
+            self.grid_view.empty_label.show()
+        elif not self.apps_model.apps and not self.grid_view.loading_indicator.isVisible():
+            self.grid_view.empty_label.setText("No apps found")
+            self.grid_view.empty_label.show()
+        else:
+            self.grid_view.empty_label.hide()
+        
+    def on_rate_limited(self, reset_time, pending_apps):
+        # Fetch what is still missing once the rate-limit window resets
+        delay = int((max(0, reset_time - time.time()) + 5) * 1000)
+        self.retry_timer.start(delay)
+        when = time.strftime('%H:%M', time.localtime(reset_time))
+        if pending_apps:
+            message = f"GitHub rate limit reached; {len(pending_apps)} apps will update at {when}"
+        else:
+            # The app list itself could not be fetched; keep the cached one
+            self.fetch_failed = True
+            message = f"GitHub rate limit reached; retrying at {when}"
+        self.statusBar().showMessage(message, delay)
         
     def show_error(self, error_message):
+        self.fetch_failed = True
         QMessageBox.warning(self, "Error", error_message)
         
     def show_app_details(self, app_data):
-        # Create detail view
-        detail_view = AppDetailView(app_data)
-        
-        # Create container with back button
-        container = QWidget()
-        layout = QVBoxLayout(container)
-        
-        # Add back button
-        layout.addWidget(self.back_button)
-        
-        # Add detail view
-        layout.addWidget(detail_view)
-        
-        # Add to stacked widget and show
-        self.stacked_widget.addWidget(container)
+        container = self.detail_views.get(app_data)
+        metrics.increment('detail_view_cache_total', result='miss' if container is None else 'hit')
+        if container is None:
+            # The detail view and the install machinery behind it are only
+            # loaded once someone opens an app
+            from app_detail_view import AppDetailView
+            
+            # Create detail view
+            with metrics.timer('detail_view_build_seconds'):
+                detail_view = AppDetailView(app_data)
+            detail_view.installed_changed.connect(self.on_installed_changed)
+            
+            # Create container with back button
+            container = QWidget()
+            layout = QVBoxLayout(container)
+            
+            # Add back button
+            back_button = QPushButton("Back to Apps")
+            back_button.setFixedSize(120, 40)
+            back_button.clicked.connect(self.show_grid_view)
+            layout.addWidget(back_button)
+            
+            # Add detail view
+            layout.addWidget(detail_view)
+            self.detail_views.put(app_data, container, detail_view)
+            
         self.stacked_widget.setCurrentWidget(container)
         
     def show_grid_view(self):
-        # Show grid view and remove any detail views
+        # The detail view is kept for next time; older ones are evicted
+        # once the cache is over budget
         self.stacked_widget.setCurrentWidget(self.grid_view)
+        self.detail_views.trim()
         
-        # Remove all widgets except the grid view
-        while self.stacked_widget.count() > 1:
-            widget = self.stacked_widget.widget(self.stacked_widget.count() - 1)
-            self.stacked_widget.removeWidget(widget)
-            widget.deleteLater()
+    def show_metrics_panel(self):
+        from metrics_panel import MetricsPanel
+        if self.metrics_panel is None:
+            self.metrics_panel = MetricsPanel(self)
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
         
     def closeEvent(self, event):
         # Stop the thread before closing
-        if self.github_fetcher.isRunning():
+        if self.github_fetcher and self.github_fetcher.isRunning():
             self.github_fetcher.stop()
             self.github_fetcher.wait(1000)  # Wait up to 1 second
         event.accept()
@@ -278,6 +605,7 @@ def main():
     
     # Set application style
     app.setStyle("Fusion")
+    metrics.start_from_environment()
     
     window = AppStore()
     window.show()
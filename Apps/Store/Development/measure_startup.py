@@ -0,0 +1,122 @@
+"""Measure how long the store takes to start and keep a history of it.
+
+Each run starts a fresh interpreter that imports main, creates the
+window and waits for its first paint, then exits before the network
+fetch matters. The median of several runs is appended as one JSON line
+to the history file together with the current commit, so regressions
+show up when comparing lines:
+
+    python Apps/Store/Development/measure_startup.py --runs 5
+    python Apps/Store/Development/measure_startup.py --importtime
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from paths import get_data_dir
+
+HERE = Path(__file__).resolve().parent
+
+# Runs inside the child interpreter; prints one JSON line
+CHILD = r"""
+import os, sys, time, json
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from PyQt6.QtCore import QEvent, QObject
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            shown = time.perf_counter()
+            print(json.dumps({
+                'import_ms': (imported - start) * 1000,
+                'window_shown_ms': (shown - start) * 1000,
+                'modules': len(sys.modules),
+            }), flush=True)
+            # Skip shutdown; the fetcher thread may still be running
+            os._exit(0)
+        return False
+
+window = main.AppStore()
+window_filter = FirstPaint()
+window.installEventFilter(window_filter)
+window.show()
+app.exec()
+"""
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_once(env):
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=HERE, env=env,
+                            capture_output=True, text=True, timeout=60)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"Startup run failed:\n{result.stderr}")
+
+def show_importtime(env, count=15):
+    # -X importtime reports self and cumulative microseconds per module
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print("Slowest imports (cumulative ms):")
+    for cumulative, name in sorted(rows, reverse=True)[:count]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure DDP App Store startup time")
+    parser.add_argument('--runs', type=int, default=5, help="number of cold starts to measure")
+    parser.add_argument('--output', help="history file (default: <data dir>/startup_times.jsonl)")
+    parser.add_argument('--offscreen', action='store_true',
+                        help="render without a display (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument('--importtime', action='store_true',
+                        help="also list the slowest imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': len(runs),
+        'import_ms': round(statistics.median(r['import_ms'] for r in runs), 1),
+        'window_shown_ms': round(statistics.median(r['window_shown_ms'] for r in runs), 1),
+        'modules': runs[-1]['modules'],
+    }
+
+    output = Path(args.output) if args.output else get_data_dir() / 'startup_times.jsonl'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+    print(f"import {record['import_ms']} ms, window shown {record['window_shown_ms']} ms "
+          f"({record['modules']} modules, median of {record['runs']})")
+    print(f"Appended to {output}")
+    if args.importtime:
+        show_importtime(env)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Counters, timings and gauges from the store's hot paths.
+
+Code records into one process-wide registry through the module-level
+functions; recording is a dict update under a lock, cheap enough for
+paint and per-request paths:
+
+    metrics.increment('http_cache_total', result='fresh')
+    metrics.observe('image_decode_seconds', elapsed, kind='scaled')
+    with metrics.timer('detail_view_build_seconds'):
+        ...
+
+The registry is shown by the debug panel (Ctrl+Shift+M) and can be
+exported as JSON or Prometheus text. DDPAPPS_METRICS_FILE writes it to a
+file when the store exits (.prom or .txt for Prometheus text, otherwise
+JSON); DDPAPPS_METRICS_PORT serves both formats on 127.0.0.1 at
+/metrics and /metrics.json.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+PREFIX = 'ddpapps_'
+
+# Upper bounds in seconds of the histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def endpoint_class(url):
+    """Coarse name for what a URL fetches, used to group request metrics"""
+    path = urlsplit(url).path
+    if '/git/trees/' in path:
+        return 'api_tree'
+    if '/contents/' in path:
+        return 'api_contents'
+    if '/repos/' in path:
+        return 'api_other'
+    if path.endswith('/catalog.json'):
+        return 'catalog'
+    for section, name in (('/Info/', 'raw_info'), ('/Images/', 'raw_image'),
+                          ('/Thumbs/', 'raw_image'), ('/Package/', 'raw_package'),
+                          ('/Deltas/', 'raw_delta')):
+        if section in path:
+            return name
+    return 'other'
+
+def thread_groups():
+    """Live threads by name with the worker number dropped"""
+    groups = {}
+    for thread in threading.enumerate():
+        group = re.sub(r'[-_]\d.*$', '', thread.name)
+        groups[group] = groups.get(group, 0) + 1
+    return groups
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+class Metrics:
+    """Thread-safe registry of labelled counters and histograms, plus
+    gauges read from callbacks when a snapshot is taken"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.gauges = {}  # name -> (callback, label name)
+        self.started_at = time.time()
+        self.server = None
+        self.register_gauge('threads', thread_groups, 'group')
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_gauge(self, name, callback, label=None):
+        """callback returns a number, or a dict of numbers keyed by the
+        value of label"""
+        with self.lock:
+            self.gauges[name] = (callback, label)
+
+    def read_gauges(self):
+        with self.lock:
+            gauges = list(self.gauges.items())
+        samples = []
+        for name, (callback, label) in gauges:
+            try:
+                value = callback()
+            except Exception as e:
+                print(f"Error reading metric {name}: {str(e)}")
+                continue
+            if isinstance(value, dict):
+                for label_value, number in sorted(value.items()):
+                    samples.append((name, ((label, str(label_value)),), number))
+            elif value is not None:
+                samples.append((name, (), value))
+        return samples
+
+    def snapshot(self):
+        with self.lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), 'count': h.count,
+                           'sum': h.sum, 'max': h.max,
+                           'mean': h.sum / h.count if h.count else 0,
+                           'buckets': dict(zip(BUCKETS, h.bucket_counts))}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        gauges = [{'name': name, 'labels': dict(labels), 'value': value}
+                  for name, labels, value in self.read_gauges()]
+        return {'timestamp': time.time(), 'uptime': time.time() - self.started_at,
+                'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        def sample(name, labels, value, kind):
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                typed.add(name)
+            lines.append(f"{PREFIX}{name}{format_labels(labels)} {value}")
+
+        for counter in snapshot['counters']:
+            sample(counter['name'], counter['labels'], counter['value'], 'counter')
+        for gauge in snapshot['gauges']:
+            sample(gauge['name'], gauge['labels'], gauge['value'], 'gauge')
+        for histogram in snapshot['histograms']:
+            name, labels = histogram['name'], histogram['labels']
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                lines.append(f"{PREFIX}{name}_bucket{format_labels(dict(labels, le=bound))} "
+                             f"{cumulative}")
+            lines.append(f"{PREFIX}{name}_bucket{format_labels(dict(labels, le='+Inf'))} "
+                         f"{histogram['count']}")
+            lines.append(f"{PREFIX}{name}_sum{format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{PREFIX}{name}_count{format_labels(labels)} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path):
+        """Write a snapshot to path, as Prometheus text for .prom and .txt"""
+        path = str(path)
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing metrics: {str(e)}")
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json in the background"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = registry.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = registry.to_json(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="MetricsServer",
+                         daemon=True).start()
+        return self.server.server_address[1]
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+_metrics = Metrics()
+
+def get_metrics():
+    return _metrics
+
+def increment(name, value=1, **labels):
+    _metrics.increment(name, value, **labels)
+
+def observe(name, value, **labels):
+    _metrics.observe(name, value, **labels)
+
+def timer(name, **labels):
+    return _metrics.timer(name, **labels)
+
+def register_gauge(name, callback, label=None):
+    _metrics.register_gauge(name, callback, label)
+
+def start_from_environment():
+    """Export metrics as asked for by DDPAPPS_METRICS_FILE / _PORT"""
+    path = os.environ.get('DDPAPPS_METRICS_FILE')
+    if path:
+        atexit.register(_metrics.dump, path)
+    port = os.environ.get('DDPAPPS_METRICS_PORT')
+    if port:
+        try:
+            port = _metrics.serve(int(port))
+            print(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+        except (OSError, ValueError) as e:
+            print(f"Error serving metrics: {str(e)}")
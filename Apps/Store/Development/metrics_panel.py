@@ -0,0 +1,88 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog)
+from PyQt6.QtCore import Qt, QTimer
+
+from metrics import get_metrics
+
+class MetricsPanel(QDialog):
+    """Live view of the metrics registry, refreshed every second while open"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Metrics")
+        self.resize(760, 560)
+        self.metrics = get_metrics()
+        self.setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Metric", "Labels", "Value"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        save_json = QPushButton("Save JSON...")
+        save_json.clicked.connect(lambda: self.save("JSON (*.json)", 'metrics.json'))
+        save_prometheus = QPushButton("Save Prometheus...")
+        save_prometheus.clicked.connect(lambda: self.save("Prometheus text (*.prom)",
+                                                          'metrics.prom'))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(save_json)
+        buttons.addWidget(save_prometheus)
+        buttons.addStretch()
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = self.metrics.snapshot()
+        rows = []
+        for counter in snapshot['counters']:
+            rows.append((counter['name'], counter['labels'], f"{counter['value']:,}"))
+        for gauge in snapshot['gauges']:
+            rows.append((gauge['name'], gauge['labels'], f"{gauge['value']:,}"))
+        for histogram in snapshot['histograms']:
+            rows.append((histogram['name'], histogram['labels'],
+                         f"{histogram['count']:,} x {histogram['mean'] * 1000:.1f} ms "
+                         f"(max {histogram['max'] * 1000:.1f} ms)"))
+
+        self.table.setRowCount(len(rows))
+        for row, (name, labels, value) in enumerate(rows):
+            label_text = ', '.join(f"{key}={value}" for key, value in labels.items())
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(label_text))
+            value_item = QTableWidgetItem(value)
+            value_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 2, value_item)
+
+        status = f"Up {snapshot['uptime']:.0f} s"
+        if self.metrics.server is not None:
+            status += f" - serving on http://127.0.0.1:{self.metrics.server.server_address[1]}/metrics"
+        self.status_label.setText(status)
+
+    def save(self, file_filter, default_name):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Metrics", default_name, file_filter)
+        if path:
+            self.metrics.dump(path)
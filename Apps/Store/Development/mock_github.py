@@ -0,0 +1,410 @@
+"""Local stand-in for the GitHub endpoints the store talks to.
+
+Serves a synthetic Apps/ catalog through the same contents, git trees and
+raw URLs GitHubFetcher uses, with X-RateLimit headers, ETags, Range and
+If-Range on raw files, and optional latency and error injection. Used by
+benchmark.py and the tests.
+"""
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from catalog import (APPS_ROOT, BRANCH, CATALOG_VERSION, REPO, apply_image_file,
+                     apply_info_file, new_app_data)
+
+RATE_LIMIT = 5000
+
+def png_chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data +
+            struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+def noise_png(width, height, rng):
+    """Head and tail of an RGB PNG of random pixels, which barely
+    compresses, so its size on the wire follows its dimensions"""
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    rows = b''.join(b'\0' + rng.randbytes(width * 3) for _ in range(height))
+    head = b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + \
+        png_chunk(b'IDAT', zlib.compress(rows, 1))
+    return head, png_chunk(b'IEND', b'')
+
+def png_marker(key):
+    # Fixed size, so every image built on the same prefix has one size
+    return png_chunk(b'tEXt', b'Comment\0' + key.encode().ljust(24)[:24])
+
+class Blob:
+    """File content made of a prefix shared by many apps and a short
+    per-app marker, so thousands of distinct blobs cost one prefix in
+    memory and one hash of it"""
+
+    def __init__(self, prefix, marker, suffix=b'', prefix_hash=None):
+        self.prefix = prefix
+        self.marker = marker
+        self.suffix = suffix
+        self.size = len(prefix) + len(marker) + len(suffix)
+        if prefix_hash is None:
+            prefix_hash = hashlib.sha1(b"blob %d\0" % self.size + prefix)
+        sha = prefix_hash.copy()
+        sha.update(marker + suffix)
+        self.sha = sha.hexdigest()
+
+    def data(self):
+        return self.prefix + self.marker + self.suffix
+
+class SharedPrefix:
+    def __init__(self, prefix, marker_size, suffix=b''):
+        self.prefix = prefix
+        self.marker_size = marker_size
+        self.suffix = suffix
+        size = len(prefix) + marker_size + len(suffix)
+        self.hash = hashlib.sha1(b"blob %d\0" % size + prefix)
+
+    def blob(self, marker):
+        marker = marker.ljust(self.marker_size)[:self.marker_size]
+        return Blob(self.prefix, marker, self.suffix, self.hash)
+
+class SyntheticRepo:
+    """A repository with apps Apps/App00000.. laid out like the real one:
+    Info/{name,description,extra}.txt, Images/{logo,screenN}.png and one
+    package file each. Every file is distinct, so per-blob caches behave
+    as they would on the real catalog."""
+
+    def __init__(self, apps=100, logo_size=(128, 128), screenshots=3,
+                 screenshot_size=(1280, 720), package_size=1024 * 1024, seed=0):
+        rng = random.Random(seed)
+        # PNG readers stop at IEND; the marker goes in a text chunk before it
+        logo_head, logo_tail = noise_png(*logo_size, rng)
+        screen_head, screen_tail = noise_png(*screenshot_size, rng)
+        marker_size = len(png_marker(''))
+        logos = SharedPrefix(logo_head, marker_size, logo_tail)
+        screens = SharedPrefix(screen_head, marker_size, screen_tail)
+        packages = SharedPrefix(rng.randbytes(max(0, package_size - 32)), min(32, package_size))
+
+        self.files = {}  # path -> Blob
+        self.directories = {}  # path -> {name: Blob, or None for a directory}
+        self.tree_shas = {}  # path -> SHA, dropped when anything below changes
+        self.edits = Counter()  # app_path -> times edited
+        self.apps = []
+        for index in range(apps):
+            name = f"App{index:05d}"
+            app_path = f"{APPS_ROOT}/{name}"
+            self.apps.append(app_path)
+            words = ' '.join(rng.choice(('fast', 'simple', 'photo', 'music', 'note',
+                                         'editor', 'viewer', 'tool', 'game', 'chat'))
+                             for _ in range(12))
+            self.add_text(f"{app_path}/Info/name.txt", f"Synthetic App {index}")
+            self.add_text(f"{app_path}/Info/description.txt", f"A {words} app.")
+            self.add_text(f"{app_path}/Info/extra.txt",
+                          f"Version: 1.{index % 10}\nAuthor: Benchmark\n")
+            self.add_file(f"{app_path}/Images/logo.png", logos.blob(
+                png_marker(f"{app_path}/logo")))
+            for screen in range(1, screenshots + 1):
+                self.add_file(f"{app_path}/Images/screen{screen}.png", screens.blob(
+                    png_marker(f"{app_path}/{screen}")))
+            self.add_file(f"{app_path}/Package/{name}.exe", packages.blob(app_path.encode()))
+
+    def add_text(self, path, text):
+        self.add_file(path, Blob(text.encode(), b''))
+
+    def add_file(self, path, blob):
+        self.files[path] = blob
+        self.tree_shas.clear()
+        parent, name = path.rsplit('/', 1)
+        self.directories.setdefault(parent, {})[name] = blob
+        while '/' in parent:
+            parent, name = parent.rsplit('/', 1)
+            self.directories.setdefault(parent, {}).setdefault(name, None)
+        self.directories.setdefault('', {}).setdefault(parent, None)
+
+    def directory(self, path):
+        """Entries directly inside path, as (name, path, Blob or None)"""
+        entries = self.directories.get(path.rstrip('/'), {})
+        return [(name, f"{path}/{name}", entries[name]) for name in sorted(entries)]
+
+    def edit_app(self, app_path):
+        """Change an app's description, as a commit to its Info would"""
+        self.edits[app_path] += 1
+        self.add_text(f"{app_path}/Info/description.txt",
+                      f"An app edited {self.edits[app_path]} times.")
+
+    def tree_sha(self, path):
+        """SHA of a git tree object over the directory's entries, so it
+        changes whenever anything below the directory does"""
+        sha = self.tree_shas.get(path)
+        if sha is not None:
+            return sha
+        entries = self.directories.get(path, {})
+        # git orders directories as if their names ended in a slash
+        names = sorted(entries, key=lambda name: name + '/' if entries[name] is None else name)
+        body = b''
+        for name in names:
+            blob = entries[name]
+            if blob is None:
+                body += b"40000 " + name.encode() + b"\0" + \
+                    bytes.fromhex(self.tree_sha(f"{path}/{name}" if path else name))
+            else:
+                body += b"100644 " + name.encode() + b"\0" + bytes.fromhex(blob.sha)
+        sha = hashlib.sha1(b"tree %d\0" % len(body) + body).hexdigest()
+        self.tree_shas[path] = sha
+        return sha
+
+    def tree(self):
+        entries = [{'path': APPS_ROOT, 'type': 'tree', 'sha': self.tree_sha(APPS_ROOT)}]
+        for app_path in self.apps:
+            entries.append({'path': app_path, 'type': 'tree', 'sha': self.tree_sha(app_path)})
+            for section in ('Info', 'Images', 'Package'):
+                entries.append({'path': f"{app_path}/{section}", 'type': 'tree',
+                                'sha': self.tree_sha(f"{app_path}/{section}")})
+        for path, blob in self.files.items():
+            entries.append({'path': path, 'type': 'blob', 'sha': blob.sha, 'size': blob.size})
+        return {'sha': self.tree_sha(''), 'tree': entries, 'truncated': False}
+
+    def catalog(self, raw_url):
+        apps = []
+        for app_path in self.apps:
+            app_data = new_app_data(app_path)
+            for section in ('Info', 'Images', 'Package'):
+                for name, path, blob in self.directory(f"{app_path}/{section}"):
+                    url = raw_url(path)
+                    app_data['blob_shas'][url] = blob.sha
+                    if section == 'Info':
+                        apply_info_file(app_data, name, blob.data().decode())
+                    elif section == 'Images':
+                        apply_image_file(app_data, name, url)
+                    else:
+                        app_data['package_files'].append({
+                            'name': name, 'download_url': url,
+                            'size': blob.size, 'sha': blob.sha})
+            apps.append(app_data)
+        return {'version': CATALOG_VERSION, 'apps': apps}
+
+class MockGitHub:
+    """Threaded HTTP server answering GitHub API and raw requests for a
+    SyntheticRepo.
+
+    mode picks what the client finds first: 'catalog' serves catalog.json,
+    'tree' only the recursive tree, 'contents' only the per-directory
+    contents API. Every request sleeps latency seconds (plus up to jitter)
+    and fails with a 503 at error_rate. A partial response carries at
+    most max_range bytes when that is set, like a server or proxy cutting
+    ranges short. Requests, bytes and statuses are counted per endpoint
+    class.
+    """
+
+    def __init__(self, repo, mode='tree', latency=0.0, jitter=0.0, error_rate=0.0,
+                 seed=0, host='127.0.0.1', port=0, max_range=0):
+        self.repo = repo
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_range = max_range
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.bytes = Counter()
+        self.statuses = Counter()
+        self.info_apps = set()  # apps whose Info files were requested
+        self.remaining = RATE_LIMIT
+        self.reset_time = int(time.time()) + 3600
+        self.responses = {}  # cached JSON bodies by path
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self):
+        return f"{self.base_url}/api"
+
+    @property
+    def raw_base(self):
+        return f"{self.base_url}/raw"
+
+    def raw_url(self, path):
+        return f"{self.raw_base}/{REPO}/{BRANCH}/{path}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       name="MockGitHub", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        with self.lock:
+            return {'requests': dict(self.requests), 'bytes': dict(self.bytes),
+                    'statuses': {str(k): v for k, v in self.statuses.items()},
+                    'info_apps': len(self.info_apps),
+                    'total_requests': sum(self.requests.values()),
+                    'total_bytes': sum(self.bytes.values())}
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes.clear()
+            self.statuses.clear()
+            self.info_apps.clear()
+
+    def edit_apps(self, count):
+        """Edit count apps spread over the catalog; returns their paths"""
+        apps = self.repo.apps
+        step = max(1, len(apps) // max(1, count))
+        edited = apps[::step][:count]
+        with self.lock:
+            for app_path in edited:
+                self.repo.edit_app(app_path)
+            self.responses.clear()
+        return edited
+
+    def handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this
+            # every keep-alive response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                mock.handle(self)
+
+            def do_HEAD(self):
+                mock.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def route(self, path):
+        """(endpoint class, body or None, content type) for a request path"""
+        api_prefix = f"/api/repos/{REPO}"
+        raw_prefix = f"/raw/{REPO}/{BRANCH}/"
+        if path.startswith(raw_prefix):
+            file_path = path[len(raw_prefix):]
+            if file_path == 'catalog.json':
+                if self.mode != 'catalog':
+                    return 'catalog', None, None
+                return 'catalog', self.json_body('catalog', lambda: self.repo.catalog(
+                    self.raw_url)), 'application/json'
+            blob = self.repo.files.get(file_path)
+            if blob is None:
+                return 'raw_other', None, None
+            section = file_path.split('/')[2] if file_path.count('/') >= 3 else ''
+            kind = {'Info': 'raw_info', 'Images': 'raw_image',
+                    'Package': 'raw_package'}.get(section, 'raw_other')
+            return kind, blob.data(), 'application/octet-stream'
+
+        if path == f"{api_prefix}/git/trees/{BRANCH}":
+            if self.mode == 'contents':
+                return 'tree', None, None
+            return 'tree', self.json_body('tree', self.repo.tree), 'application/json'
+
+        if path.startswith(f"{api_prefix}/contents/"):
+            dir_path = path[len(f"{api_prefix}/contents/"):].rstrip('/')
+            entries = self.repo.directory(dir_path)
+            if not entries:
+                return 'contents', None, None
+            return 'contents', self.json_body(path, lambda: [
+                {'name': name, 'path': entry_path, 'sha': blob.sha if blob else self.repo.tree_sha(entry_path),
+                 'size': blob.size if blob else 0, 'type': 'file' if blob else 'dir',
+                 'download_url': self.raw_url(entry_path) if blob else None}
+                for name, entry_path, blob in entries]), 'application/json'
+        return 'other', None, None
+
+    def json_body(self, key, build):
+        with self.lock:
+            body = self.responses.get(key)
+        if body is None:
+            body = json.dumps(build(), separators=(',', ':')).encode()
+            with self.lock:
+                self.responses[key] = body
+        return body
+
+    def handle(self, request):
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        path = unquote(urlsplit(request.path).path)
+        kind, body, content_type = self.route(path)
+        headers = {}
+        if kind in ('tree', 'contents'):
+            with self.lock:
+                self.remaining = max(0, self.remaining - 1)
+                headers = {'X-RateLimit-Limit': str(RATE_LIMIT),
+                           'X-RateLimit-Remaining': str(self.remaining),
+                           'X-RateLimit-Reset': str(self.reset_time)}
+
+        with self.lock:
+            failed = self.error_rate and self.random.random() < self.error_rate
+        if failed:
+            status, body = 503, b'Service Unavailable'
+        elif body is None:
+            status, body = 404, b'{"message":"Not Found"}'
+        else:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers['ETag'] = etag
+            headers['Cache-Control'] = 'max-age=0'
+            status = 304 if request.headers.get('If-None-Match') == etag else 200
+            if status == 304:
+                body = b''
+            elif kind.startswith('raw_'):
+                headers['Accept-Ranges'] = 'bytes'
+                if_range = request.headers.get('If-Range')
+                byte_range = self.parse_range(request.headers.get('Range'), len(body))
+                if byte_range and (if_range is None or if_range == etag):
+                    start, end = byte_range
+                    if self.max_range:
+                        end = min(end, start + self.max_range - 1)
+                    headers['Content-Range'] = f"bytes {start}-{end}/{len(body)}"
+                    status, body = 206, body[start:end + 1]
+
+        with self.lock:
+            if kind == 'raw_info':
+                file_path = path[len(f"/raw/{REPO}/{BRANCH}/"):]
+                self.info_apps.add('/'.join(file_path.split('/')[:2]))
+            self.requests[kind] += 1
+            self.bytes[kind] += 0 if request.command == 'HEAD' else len(body)
+            self.statuses[status] += 1
+
+        request.send_response(status)
+        request.send_header('Content-Type', content_type or 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        if request.command != 'HEAD':
+            try:
+                request.wfile.write(body)
+            except ConnectionError:
+                # The client stopped reading, e.g. a cancelled download
+                request.close_connection = True
+
+    def parse_range(self, header, size):
+        """(first, last) byte of a single bytes=first-[last] range, or None"""
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None
+        first, _, last = header[len('bytes='):].partition('-')
+        try:
+            first = int(first)
+            last = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if first >= size or last < first:
+            return None
+        return first, min(last, size - 1)
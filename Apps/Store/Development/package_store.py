@@ -0,0 +1,129 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+
+from installed_index import get_installed_index
+from paths import get_data_dir
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Objects are stored as <sha[:2]>/<sha[2:]>; anything else in the store
+# is a partial download, a patch output or a temporary file
+OBJECT_SHA = re.compile(r'[0-9a-f]{40}')
+
+class IntegrityError(Exception):
+    pass
+
+class ContentHasher:
+    """Checks downloaded bytes against the catalog's hashes.
+
+    The git blob SHA-1 always matches the tree metadata; the SHA-256 is
+    only checked when the catalog provides one. The downloader feeds the
+    bytes as they stream in when it can, otherwise it hashes the finished
+    part file.
+    """
+
+    def __init__(self, git_sha=None, sha256=None, name=None):
+        self.name = name
+        self.expected_git_sha = git_sha
+        self.expected_sha256 = sha256
+        self.git = None
+        self.sha256 = None
+
+    def start(self, size):
+        # The git blob header needs the size before any content
+        self.git = hashlib.sha1(f"blob {size}\0".encode())
+        self.sha256 = hashlib.sha256() if self.expected_sha256 else None
+
+    def update(self, data):
+        self.git.update(data)
+        if self.sha256 is not None:
+            self.sha256.update(data)
+
+    def hash_file(self, path):
+        self.start(os.path.getsize(path))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                self.update(block)
+
+    def verify(self, path):
+        name = self.name or os.path.basename(path)
+        if self.expected_git_sha and self.git.hexdigest() != self.expected_git_sha:
+            raise IntegrityError(f"Checksum mismatch for {name}")
+        if self.sha256 is not None and self.sha256.hexdigest() != self.expected_sha256:
+            raise IntegrityError(f"SHA-256 mismatch for {name}")
+
+class PackageStore:
+    """Package files stored once under their git blob SHA.
+
+    Installed apps reference objects through hardlinks (copies where the
+    filesystem can not link), so a file shared between apps or versions
+    is downloaded and stored only once. Objects that no installed app
+    lists and no running install has pinned are removed by
+    collect_garbage.
+    """
+
+    def __init__(self, directory=None, installed_index=None):
+        self.directory = directory or (get_data_dir() / 'store' / 'objects')
+        self.installed_index = installed_index
+        self.lock = threading.Lock()
+        self.pins = Counter()  # sha -> installs still using it
+
+    def pin(self, shas):
+        """Keep objects from collect_garbage while an install needs them"""
+        with self.lock:
+            self.pins.update(shas)
+
+    def unpin(self, shas):
+        with self.lock:
+            self.pins.subtract(shas)
+            # Drops the SHAs whose count reached zero
+            self.pins += Counter()
+
+    def path_for(self, sha):
+        return self.directory / sha[:2] / sha[2:]
+
+    def contains(self, sha, size=None):
+        try:
+            stat = self.path_for(sha).stat()
+        except OSError:
+            return False
+        return size is None or stat.st_size == size
+
+    def link(self, sha, destination):
+        """Place the object at destination, replacing any existing file"""
+        source = self.path_for(sha)
+        tmp_path = destination.with_name(f"{destination.name}.{threading.get_ident()}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, destination)
+
+    def collect_garbage(self):
+        index = self.installed_index or get_installed_index()
+        referenced = index.referenced_shas()
+        removed = 0
+        with self.lock:
+            referenced.update(self.pins)
+            for path in self.directory.glob('*/*'):
+                sha = path.parent.name + path.name
+                if not OBJECT_SHA.fullmatch(sha) or sha in referenced:
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    continue
+        return removed
+
+_package_store = None
+
+def get_package_store():
+    global _package_store
+    if _package_store is None:
+        _package_store = PackageStore()
+    return _package_store
@@ -0,0 +1,13 @@
+import os
+from pathlib import Path
+
+def get_data_dir():
+    """Per-user DDPApps directory (%LOCALAPPDATA%/DDPApps on Windows)"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_DATA_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return Path(base) / 'DDPApps'
+
+def get_cache_dir():
+    """Directory for data that can be rebuilt from the network"""
+    return get_data_dir() / 'cache'
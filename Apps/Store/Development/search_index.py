@@ -0,0 +1,144 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Shorter query words only match exactly or as a prefix
+MIN_FUZZY_LENGTH = 4
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return TOKEN_RE.findall(text)
+
+def app_tokens(app_data):
+    fields = [app_data.get('name', ''), app_data.get('description', '')]
+    for key, value in (app_data.get('extra') or {}).items():
+        fields.append(key)
+        fields.append(value)
+    tokens = set()
+    for field in fields:
+        tokens.update(tokenize(str(field)))
+    return tokens
+
+def deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+def within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion,
+    substitution or swap of neighbouring characters"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if a[i + 1:] == b[i + 1:]:
+        return True
+    return (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i]
+            and a[i + 2:] == b[i + 2:])
+
+class SearchIndex:
+    """Inverted index over app names, descriptions and extra info.
+
+    Apps are added (or re-added after a change) one at a time as they
+    stream in. Every query word matches index words it is a prefix of;
+    a word with no such match falls back to words one typo away. The
+    result is the set of app paths matching every query word.
+    """
+
+    def __init__(self):
+        self.postings = {}  # token -> set of app_paths
+        self.app_tokens = {}  # app_path -> tokens, to undo an add
+        self.deletes = {}  # token with one character removed -> tokens
+        self.vocabulary = []  # sorted, may hold tokens without postings
+        self.vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self.app_tokens)
+
+    def __contains__(self, app_path):
+        return app_path in self.app_tokens
+
+    def add(self, app_data):
+        app_path = app_data['app_path']
+        tokens = app_tokens(app_data)
+        old_tokens = self.app_tokens.get(app_path, set())
+        for token in old_tokens - tokens:
+            self.remove_posting(token, app_path)
+        for token in tokens - old_tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                self.vocabulary_dirty = True
+                if len(token) >= MIN_FUZZY_LENGTH - 1:
+                    for variant in deletes(token):
+                        self.deletes.setdefault(variant, set()).add(token)
+            posting.add(app_path)
+        self.app_tokens[app_path] = tokens
+
+    def remove(self, app_path):
+        for token in self.app_tokens.pop(app_path, ()):
+            self.remove_posting(token, app_path)
+
+    def remove_posting(self, token, app_path):
+        posting = self.postings[token]
+        posting.discard(app_path)
+        if posting:
+            return
+        del self.postings[token]
+        if len(token) >= MIN_FUZZY_LENGTH - 1:
+            for variant in deletes(token):
+                matches = self.deletes[variant]
+                matches.discard(token)
+                if not matches:
+                    del self.deletes[variant]
+
+    def search(self, query):
+        """App paths matching query, or None when query has no words"""
+        words = tokenize(query)
+        if not words:
+            return None
+        if self.vocabulary_dirty:
+            # Rebuilt at most once per batch of added apps
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_dirty = False
+
+        result = None
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self.match_prefix(word)
+            if not matches and len(word) >= MIN_FUZZY_LENGTH:
+                matches = self.match_fuzzy(word)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
+
+    def match_prefix(self, prefix):
+        matches = set()
+        vocabulary = self.vocabulary
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            posting = self.postings.get(vocabulary[i])
+            if posting:
+                matches |= posting
+            i += 1
+        return matches
+
+    def match_fuzzy(self, word):
+        candidates = set(self.deletes.get(word, ()))
+        for variant in deletes(word):
+            if variant in self.postings:
+                candidates.add(variant)
+            candidates |= self.deletes.get(variant, set())
+        matches = set()
+        for token in candidates:
+            if within_one_edit(word, token):
+                matches |= self.postings.get(token, set())
+        return matches
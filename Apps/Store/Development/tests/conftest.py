@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The store's modules are imported flat, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+@pytest.fixture(scope='session')
+def qapp():
+    # One QApplication for the whole run; widgets need it and signals
+    # from worker threads are delivered through its event loop
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+import app_grid
+from app_grid import AppListModel
+from image_cache import PixmapCache
+
+def make_model(count):
+    model = AppListModel()
+    model.add_apps([{'app_path': f"Apps/App{i}", 'name': f"App {i}"} for i in range(count)])
+    return model
+
+def removals(model):
+    removed = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    return removed
+
+def test_remove_apps_in_runs():
+    model = make_model(10)
+    removed = removals(model)
+    model.remove_apps(['Apps/App1', 'Apps/App2', 'Apps/App3', 'Apps/App7', 'Apps/Gone'])
+    assert removed == [(7, 7), (1, 3)]
+    assert model.app_paths() == [f"Apps/App{i}" for i in (0, 4, 5, 6, 8, 9)]
+    assert model.rowCount() == 6
+    assert all(model.rows[app_path] == i for i, app_path in enumerate(model.app_paths()))
+
+def test_remove_apps_while_filtered():
+    model = make_model(6)
+    model.set_filter({'Apps/App1', 'Apps/App2', 'Apps/App4'})
+    removed = removals(model)
+    model.remove_apps(['Apps/App2', 'Apps/App3'])
+    assert removed == [(1, 1)]
+    assert [app_data['app_path'] for app_data in model.shown] == ['Apps/App1', 'Apps/App4']
+    assert model.shown_rows == {'Apps/App1': 0, 'Apps/App4': 1}
+    assert model.app_paths() == ['Apps/App0', 'Apps/App1', 'Apps/App4', 'Apps/App5']
+    assert model.rows['Apps/App5'] == 3
+    model.set_filter(None)
+    assert model.rowCount() == 4
+
+class FakePipeline:
+    def __init__(self):
+        self.memory_cache = PixmapCache()
+        self.loads = []
+
+    def load(self, url, callback, priority, **kwargs):
+        request = SimpleNamespace(url=url, callback=callback, priority=priority)
+        self.loads.append(request)
+        return request
+
+    def cancel(self, request):
+        pass
+
+def test_repainting_a_loading_logo_counts_one_miss(qapp, monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(app_grid, 'get_image_pipeline', lambda: pipeline)
+    model = AppListModel()
+    model.add_apps([{'app_path': 'Apps/App0', 'name': 'App 0', 'logo_path': 'logo.png'}])
+    index = model.index(0)
+
+    for _ in range(5):
+        assert index.data(Qt.ItemDataRole.DecorationRole) is None
+    assert len(pipeline.loads) == 1
+    assert pipeline.memory_cache.stats()['misses'] == 1
+
+    image = QImage(8, 8, QImage.Format.Format_ARGB32)
+    image.fill(0)
+    pipeline.loads[0].callback(image)
+    for _ in range(3):
+        assert index.data(Qt.ItemDataRole.DecorationRole) is not None
+    assert pipeline.memory_cache.stats()['misses'] == 1
+    assert pipeline.memory_cache.stats()['hits'] == 3
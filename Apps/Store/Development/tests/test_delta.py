@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+import installer
+from delta import (DeltaError, apply_delta, delta_name, find_delta_chain, make_delta,
+                   parse_delta_name)
+from download_manager import CANCELLED, QUEUED, DownloadManager
+from installer import AppInstall, DeltaUpdate
+from package_store import PackageStore
+
+def sha_of(number):
+    return (f"{number:x}" * 40)[:40]
+
+def random_bytes(size, seed):
+    return random.Random(seed).randbytes(size)
+
+def round_trip(tmp_path, source, target):
+    source_path = tmp_path / 'source'
+    output_path = tmp_path / 'output'
+    source_path.write_bytes(source)
+    delta = make_delta(source, target)
+    apply_delta(source_path, delta, output_path)
+    assert output_path.read_bytes() == target
+    return delta
+
+@pytest.mark.parametrize('source, target', [
+    (b'', b''),
+    (b'', b'new file'),
+    (b'old file', b''),
+    (b'short', b'also short'),
+])
+def test_round_trip_small(tmp_path, source, target):
+    round_trip(tmp_path, source, target)
+
+def test_round_trip_edited_file(tmp_path):
+    source = random_bytes(200000, 1)
+    # An insertion shifts everything after it, a replacement and a
+    # truncated tail
+    target = (source[:50000] + b'inserted' * 100 + source[50000:120000]
+              + random_bytes(3000, 2) + source[123000:190000])
+    delta = round_trip(tmp_path, source, target)
+    assert len(delta) < len(target) // 20
+
+def test_round_trip_unrelated_file(tmp_path):
+    round_trip(tmp_path, random_bytes(10000, 3), random_bytes(12000, 4))
+
+def test_apply_rejects_other_source(tmp_path):
+    source_path = tmp_path / 'source'
+    source_path.write_bytes(b'x' * 100)
+    with pytest.raises(DeltaError):
+        apply_delta(source_path, make_delta(b'y' * 99, b'z'), tmp_path / 'output')
+    with pytest.raises(DeltaError):
+        apply_delta(source_path, b'not a delta', tmp_path / 'output')
+
+def test_delta_names():
+    name = delta_name('app.exe', sha_of(1), sha_of(2))
+    assert parse_delta_name(name) == ('app.exe', sha_of(1)[:12], sha_of(2)[:12])
+    assert parse_delta_name('app.exe') is None
+    assert parse_delta_name('app.exe.123.456.ddpdelta') is None
+
+def make_deltas(*steps, size=10, file_name='app.exe'):
+    return [{'file': file_name, 'from': sha_of(a)[:12], 'to': sha_of(b)[:12],
+             'size': size, 'name': delta_name(file_name, sha_of(a), sha_of(b))}
+            for a, b in steps]
+
+def test_find_delta_chain():
+    deltas = make_deltas((1, 2), (2, 3), (3, 4)) + make_deltas((1, 2), file_name='other.dll')
+    chain = find_delta_chain(deltas, 'app.exe', sha_of(1), sha_of(4), 100)
+    assert [d['to'] for d in chain] == [sha_of(n)[:12] for n in (2, 3, 4)]
+    assert find_delta_chain(deltas, 'app.exe', sha_of(2), sha_of(3), 100) == [deltas[1]]
+    assert find_delta_chain(deltas, 'app.exe', sha_of(4), sha_of(4), 100) == []
+
+def test_find_delta_chain_with_gap():
+    deltas = make_deltas((1, 2), (3, 4))
+    assert find_delta_chain(deltas, 'app.exe', sha_of(1), sha_of(4), 100) is None
+    assert find_delta_chain(deltas, 'app.exe', sha_of(5), sha_of(4), 100) is None
+    assert find_delta_chain(deltas, 'other.dll', sha_of(1), sha_of(2), 100) is None
+
+def test_find_delta_chain_over_size():
+    deltas = make_deltas((1, 2), (2, 3), size=30)
+    assert find_delta_chain(deltas, 'app.exe', sha_of(1), sha_of(3), 60)
+    assert find_delta_chain(deltas, 'app.exe', sha_of(1), sha_of(3), 59) is None
+
+def test_find_delta_chain_with_cycle():
+    deltas = make_deltas((1, 2), (2, 1))
+    assert find_delta_chain(deltas, 'app.exe', sha_of(1), sha_of(3), 100) is None
+
+def test_fall_back_cancels_other_deltas(qapp, tmp_path, monkeypatch):
+    manager = DownloadManager(max_concurrent=0)
+    monkeypatch.setattr(installer, 'get_download_manager', lambda: manager)
+    monkeypatch.setattr(installer, 'get_cache_dir', lambda: tmp_path / 'cache')
+    monkeypatch.setattr(installer, 'get_package_store',
+                        lambda: PackageStore(tmp_path / 'objects'))
+    package_file = {'name': 'app.exe', 'sha': sha_of(3), 'size': 1000,
+                    'download_url': 'http://127.0.0.1:1/app.exe'}
+    install = AppInstall({'folder_name': 'App', 'package_files': [package_file]})
+    chain = make_deltas((1, 2), (2, 3))
+    for delta in chain:
+        delta['download_url'] = f"http://127.0.0.1:1/{delta['name']}"
+    update = DeltaUpdate(package_file, tmp_path / 'app.exe', chain)
+    install.start_delta(update)
+    delta_jobs = list(install.jobs)
+
+    install.fall_back(update, "Checksum mismatch")
+    assert [job.state for job in delta_jobs] == [CANCELLED, CANCELLED]
+    assert [job.state for job in install.jobs] == [QUEUED]
+    assert install.jobs[0].url == package_file['download_url']
+    assert install.total_size() == 1000
+    qapp.processEvents()
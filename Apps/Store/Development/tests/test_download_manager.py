@@ -0,0 +1,50 @@
+import pytest
+
+from download_manager import CANCELLED, PAUSED, QUEUED, DownloadManager
+
+URL = 'http://127.0.0.1:1/package.exe'
+
+@pytest.fixture
+def manager(qapp):
+    # Nothing starts, so jobs stay queued or paused
+    yield DownloadManager(max_concurrent=0)
+    qapp.processEvents()
+
+def test_cancel_paused_job_removes_partial_files(manager, tmp_path):
+    destination = tmp_path / 'package.exe'
+    job = manager.enqueue(URL, destination)
+    manager.pause(job)
+    assert job.state == PAUSED
+    for suffix in ('.part', '.part.json'):
+        (tmp_path / f"package.exe{suffix}").write_bytes(b'partial')
+
+    manager.cancel(job)
+    assert job.state == CANCELLED
+    assert list(tmp_path.iterdir()) == []
+
+def test_cancel_resumed_job_removes_partial_files(manager, tmp_path):
+    destination = tmp_path / 'package.exe'
+    job = manager.enqueue(URL, destination)
+    manager.pause(job)
+    manager.resume(job)
+    assert job.state == QUEUED
+    (tmp_path / 'package.exe.part').write_bytes(b'partial')
+
+    manager.cancel(job)
+    assert job.state == CANCELLED
+    assert list(tmp_path.iterdir()) == []
+
+def test_shared_job_survives_until_last_cancel(manager, tmp_path):
+    destination = tmp_path / 'package.exe'
+    first = manager.enqueue(URL, destination)
+    second = manager.enqueue(URL, destination)
+    assert first is second
+    failures = []
+    first.failed.connect(failures.append)
+
+    manager.cancel(first)
+    assert first.state == QUEUED
+    assert not failures
+    manager.cancel(second)
+    assert first.state == CANCELLED
+    assert failures == ["Download cancelled"]
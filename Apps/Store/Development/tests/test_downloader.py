@@ -0,0 +1,135 @@
+import os
+import threading
+
+import pytest
+
+import http_session
+from downloader import DownloadCancelled, RangedDownload
+from mock_github import MockGitHub, SyntheticRepo
+from package_store import ContentHasher
+
+PACKAGE_PATH = 'Apps/App00000/Package/App00000.exe'
+MIB = 1024 * 1024
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(package_size, **options):
+        repo = SyntheticRepo(apps=1, logo_size=(4, 4), screenshots=0,
+                             package_size=package_size)
+        mock = MockGitHub(repo, **options).start()
+        servers.append(mock)
+        return mock, repo.files[PACKAGE_PATH]
+
+    os.environ.setdefault('NO_PROXY', '127.0.0.1')
+    yield start
+    for mock in servers:
+        mock.stop()
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_short_ranges_are_continued(serve, tmp_path):
+    # Every 206 stops after 1 MiB of the 4 MiB segment it was asked for
+    mock, blob = serve(8 * MIB, max_range=MIB)
+    destination = tmp_path / 'package.exe'
+    download = RangedDownload(mock.raw_url(PACKAGE_PATH), destination,
+                              hasher=ContentHasher(blob.sha))
+    assert download.run() == str(destination)
+    assert len(download.segments) == 2
+    assert read(destination) == blob.data()
+    assert mock.statuses[206] == 8
+    assert not os.path.exists(download.part_path)
+    assert not os.path.exists(download.state_path)
+
+def test_incomplete_segments_fail(serve, tmp_path, monkeypatch):
+    mock, blob = serve(2 * MIB, max_range=MIB)
+    original_get = http_session.get
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(kwargs['headers'].get('Range'))
+        response = original_get(url, **kwargs)
+        if len(calls) > 1:
+            # A server that answers the rest of the range with nothing
+            response.iter_content = lambda chunk_size: iter(())
+        return response
+
+    monkeypatch.setattr(http_session, 'get', get)
+    download = RangedDownload(mock.raw_url(PACKAGE_PATH), tmp_path / 'package.exe')
+    with pytest.raises(IOError, match='Incomplete download'):
+        download.run()
+    assert not (tmp_path / 'package.exe').exists()
+    assert download.bytes_done() == MIB
+
+def test_resume_requests_only_the_rest(serve, tmp_path):
+    mock, blob = serve(8 * MIB)
+    destination = tmp_path / 'package.exe'
+    cancel_event = threading.Event()
+
+    def progress(done, total):
+        if done >= 3 * MIB:
+            cancel_event.set()
+
+    first = RangedDownload(mock.raw_url(PACKAGE_PATH), destination,
+                           progress_callback=progress, cancel_event=cancel_event)
+    with pytest.raises(DownloadCancelled):
+        first.run()
+    assert os.path.exists(first.state_path)
+    received = first.bytes_done()
+    assert 0 < received < blob.size
+
+    mock.reset_stats()
+    second = RangedDownload(mock.raw_url(PACKAGE_PATH), destination,
+                            hasher=ContentHasher(blob.sha))
+    assert second.run() == str(destination)
+    assert read(destination) == blob.data()
+    assert mock.stats()['bytes']['raw_package'] == blob.size - received
+    assert not os.path.exists(second.state_path)
+
+def test_changed_file_restarts_single_segment(serve, tmp_path, monkeypatch):
+    mock, blob = serve(2 * MIB)
+    destination = tmp_path / 'package.exe'
+    cancel_event = threading.Event()
+    first = RangedDownload(mock.raw_url(PACKAGE_PATH), destination, chunk_size=64 * 1024,
+                           progress_callback=lambda done, total: done >= MIB and
+                           cancel_event.set(), cancel_event=cancel_event)
+    with pytest.raises(DownloadCancelled):
+        first.run()
+    assert 0 < first.bytes_done() < blob.size
+
+    # The file changes between the HEAD that accepts the saved state and
+    # the GET, so If-Range no longer matches and the whole file comes back
+    changed = type(blob)(blob.prefix, b'changed'.ljust(len(blob.marker), b'!'))
+    original_request = http_session.request
+
+    def request(method, url, **kwargs):
+        response = original_request(method, url, **kwargs)
+        if method == 'HEAD':
+            mock.repo.files[PACKAGE_PATH] = changed
+        return response
+
+    monkeypatch.setattr(http_session, 'request', request)
+    second = RangedDownload(mock.raw_url(PACKAGE_PATH), destination)
+    assert second.run() == str(destination)
+    assert mock.statuses[200] >= 1
+    assert read(destination) == changed.data()
+
+def test_changed_file_fails_multiple_segments(serve, tmp_path, monkeypatch):
+    mock, blob = serve(8 * MIB)
+    changed = type(blob)(blob.prefix, b'changed'.ljust(len(blob.marker), b'!'))
+    original_request = http_session.request
+
+    def request(method, url, **kwargs):
+        response = original_request(method, url, **kwargs)
+        if method == 'HEAD':
+            mock.repo.files[PACKAGE_PATH] = changed
+        return response
+
+    monkeypatch.setattr(http_session, 'request', request)
+    download = RangedDownload(mock.raw_url(PACKAGE_PATH), tmp_path / 'package.exe')
+    with pytest.raises(IOError, match='ignored range'):
+        download.run()
+    assert not (tmp_path / 'package.exe').exists()
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+import github_api
+from github_api import HIGH_PRIORITY, NORMAL_PRIORITY, GitHubApi, RateLimitExceeded
+from http_cache import HttpCache
+from mock_github import MockGitHub, SyntheticRepo
+
+@pytest.fixture
+def mock():
+    mock = MockGitHub(SyntheticRepo(apps=2, logo_size=(4, 4), screenshots=0,
+                                    package_size=64)).start()
+    yield mock
+    mock.stop()
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = HttpCache(tmp_path / 'http')
+    monkeypatch.setattr(github_api, 'cached_get', cache.get)
+    return cache
+
+def tree_url(mock):
+    return f"{mock.api_base}/repos/WeXetProgram/ddpapps/git/trees/main"
+
+def near_reserve(api):
+    api.remaining = api.reserve
+    api.reset_time = time.time() + 3600
+
+def test_budget_read_from_headers(mock, cache):
+    api = GitHubApi(reserve=10)
+    assert api.get(tree_url(mock)).status_code == 200
+    assert api.remaining == 4999
+    assert api.limit == 5000
+
+def test_fresh_cache_hit_spends_no_budget(mock, cache):
+    api = GitHubApi(reserve=10)
+    api.get(tree_url(mock))
+    meta = cache.load_meta(tree_url(mock))
+    meta['expires'] = time.time() + 60
+    cache.save_meta(tree_url(mock), meta)
+    near_reserve(api)
+
+    mock.reset_stats()
+    assert api.get(tree_url(mock), NORMAL_PRIORITY).status_code == 200
+    assert api.remaining == api.reserve
+    assert mock.stats()['total_requests'] == 0
+
+def test_reserve_holds_back_normal_requests(mock, cache):
+    api = GitHubApi(reserve=10)
+    api.get(tree_url(mock))
+    near_reserve(api)
+
+    mock.reset_stats()
+    with pytest.raises(RateLimitExceeded):
+        api.get(tree_url(mock), NORMAL_PRIORITY)
+    assert mock.stats()['total_requests'] == 0
+    # High priority work may still spend the reserve; the stale entry is
+    # revalidated
+    assert api.get(tree_url(mock), HIGH_PRIORITY).status_code == 200
+    assert mock.statuses[304] == 1
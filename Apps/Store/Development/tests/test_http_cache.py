@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from http_cache import HttpCache, get_max_age, parse_cache_control
+from mock_github import MockGitHub, SyntheticRepo
+
+@pytest.fixture
+def mock():
+    mock = MockGitHub(SyntheticRepo(apps=2, logo_size=(4, 4), screenshots=0,
+                                    package_size=64)).start()
+    yield mock
+    mock.stop()
+
+def make_fresh(cache, url):
+    meta = cache.load_meta(url)
+    meta['expires'] = time.time() + 60
+    cache.save_meta(url, meta)
+
+def test_cache_control():
+    assert parse_cache_control('public, max-age=60, no-transform') == \
+        {'public': True, 'max-age': '60', 'no-transform': True}
+    assert get_max_age({'Cache-Control': 'max-age=60'}) == 60
+    assert get_max_age({'Cache-Control': 'no-cache, max-age=60'}) == 0
+    assert get_max_age({}) == 0
+
+def test_miss_revalidate_and_fresh(mock, tmp_path):
+    cache = HttpCache(tmp_path / 'http')
+    url = mock.raw_url('Apps/App00000/Info/name.txt')
+    calls = []
+
+    response = cache.get(url, before_request=lambda: calls.append(url))
+    assert response.status_code == 200 and response.text == 'Synthetic App 0'
+    assert not getattr(response, 'from_cache', False)
+
+    # Stale (max-age=0): revalidated with the ETag and answered from disk
+    response = cache.get(url, before_request=lambda: calls.append(url))
+    assert response.from_cache and response.text == 'Synthetic App 0'
+    assert mock.statuses[304] == 1
+
+    # Fresh: no request at all
+    make_fresh(cache, url)
+    response = cache.get(url, before_request=lambda: calls.append(url))
+    assert response.from_cache and response.text == 'Synthetic App 0'
+    assert len(calls) == 2
+    assert mock.stats()['total_requests'] == 2
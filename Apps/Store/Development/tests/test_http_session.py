@@ -0,0 +1,33 @@
+import threading
+import time
+
+import pytest
+
+import http_session
+from mock_github import MockGitHub, SyntheticRepo
+
+@pytest.fixture
+def mock():
+    mock = MockGitHub(SyntheticRepo(apps=1, logo_size=(4, 4), screenshots=0,
+                                    package_size=64), latency=0.3).start()
+    yield mock
+    mock.stop()
+
+def test_requests_past_pool_size_do_not_wait(mock):
+    original = dict(http_session.settings)
+    http_session.configure(pool_maxsize=1)
+    try:
+        url = mock.raw_url('Apps/App00000/Info/name.txt')
+        statuses = []
+        threads = [threading.Thread(target=lambda: statuses.append(
+            http_session.get(url).status_code)) for _ in range(4)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Four requests queued on one connection would take 1.2 s
+        assert time.perf_counter() - start < 0.9
+        assert statuses == [200] * 4
+    finally:
+        http_session.configure(**original)
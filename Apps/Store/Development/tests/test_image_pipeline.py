@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+import app_grid
+from app_grid import AppListModel
+from image_pipeline import ImagePipeline
+from image_cache import ImageDiskCache
+from mock_github import MockGitHub, SyntheticRepo
+
+@pytest.fixture
+def mock():
+    mock = MockGitHub(SyntheticRepo(apps=1, logo_size=(8, 8), screenshots=0,
+                                    package_size=64)).start()
+    yield mock
+    mock.stop()
+
+@pytest.fixture
+def pipeline(qapp, tmp_path, monkeypatch):
+    pipeline = ImagePipeline(workers=1)
+    pipeline.disk_cache = ImageDiskCache(tmp_path / 'images')
+    monkeypatch.setattr(app_grid, 'get_image_pipeline', lambda: pipeline)
+    yield pipeline
+    qapp.processEvents()
+
+def wait(condition):
+    # Deliveries arrive through the event loop
+    deadline = time.monotonic() + 10
+    while not condition() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    assert condition()
+
+def test_failed_load_calls_error_callback(pipeline, mock):
+    images, errors = [], []
+    pipeline.load(mock.raw_url('Apps/App00000/Images/logo.png'), images.append,
+                  size=(4, 4), error_callback=lambda: errors.append('logo'))
+    pipeline.load(mock.raw_url('Apps/Missing/Images/logo.png'), images.append,
+                  size=(4, 4), error_callback=lambda: errors.append('missing'))
+    wait(lambda: len(images) + len(errors) == 2)
+    assert len(images) == 1 and images[0].width() == 4
+    assert errors == ['missing']
+
+def test_failed_logo_is_requested_again(pipeline, mock):
+    model = AppListModel()
+    app_data = {'app_path': 'Apps/Missing', 'name': 'Missing',
+                'logo_path': mock.raw_url('Apps/Missing/Images/logo.png')}
+    model.add_app(app_data)
+    key = model.logo_key(app_data)
+
+    model.request_logo(app_data, app_grid.HIGH_PRIORITY)
+    assert key in model.logo_requests
+    wait(lambda: key not in model.logo_requests)
+    model.request_logo(app_data, app_grid.HIGH_PRIORITY)
+    assert key in model.logo_requests
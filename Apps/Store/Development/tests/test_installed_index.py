@@ -0,0 +1,91 @@
+import pytest
+
+from installed_index import InstalledIndex
+from utils import get_desktop_entry_apps
+
+def write_entry(applications, file_name, **values):
+    applications.mkdir(parents=True, exist_ok=True)
+    lines = ['[Desktop Entry]', 'Type=Application'] + \
+        [f"{key}={value}" for key, value in values.items()]
+    (applications / file_name).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+@pytest.fixture
+def data_home(tmp_path, monkeypatch):
+    data_home = tmp_path / 'share'
+    monkeypatch.setenv('XDG_DATA_HOME', str(data_home))
+    monkeypatch.setenv('XDG_DATA_DIRS', str(tmp_path / 'system'))
+    monkeypatch.delenv('LOCALAPPDATA', raising=False)
+    return data_home
+
+def make_index(tmp_path, scanner=get_desktop_entry_apps):
+    index = InstalledIndex(path=tmp_path / 'installed.json',
+                           system_cache_path=tmp_path / 'system_apps.json', scanner=scanner)
+    index.refresh_system_apps(force=True)
+    return index
+
+def app(folder_name, name, **extra):
+    return {'folder_name': folder_name, 'name': name, 'extra': extra,
+            'package_files': [{'name': f"{folder_name}.exe", 'sha': '1' * 40}]}
+
+def test_desktop_entries(data_home, tmp_path):
+    write_entry(data_home / 'applications', 'notes.desktop', Name='Notes',
+                Exec='/opt/Notes/notes %U')
+    write_entry(data_home / 'applications', 'work.desktop', Name='Work', Path='/srv/work',
+                Exec='work')
+    write_entry(tmp_path / 'system' / 'applications' / 'sub', 'gone.desktop', Name='Gone',
+                Hidden='true')
+    write_entry(tmp_path / 'system' / 'applications', 'plain.desktop', Name='Plain',
+                Exec='plain')
+
+    apps = sorted(get_desktop_entry_apps(), key=lambda entry: entry['name'])
+    assert apps == [
+        {'name': 'Notes', 'install_dir': '/opt/Notes', 'publisher': None},
+        {'name': 'Plain', 'install_dir': None, 'publisher': None},
+        {'name': 'Work', 'install_dir': '/srv/work', 'publisher': None},
+    ]
+
+def test_name_alone_is_not_installed(data_home, tmp_path):
+    write_entry(data_home / 'applications', 'notes.desktop', Name='notes',
+                Exec='/usr/bin/notes')
+    index = make_index(tmp_path)
+    assert not index.is_installed(app('NotesApp', 'Notes'))
+
+def test_attributable_system_apps(data_home, tmp_path):
+    write_entry(data_home / 'applications', 'editor.desktop', Name='Text Editor',
+                Exec='/opt/Editor/editor')
+    write_entry(data_home / 'applications', 'viewer.desktop', Name='Viewer', Exec='viewer')
+    index = make_index(tmp_path)
+    # Installed in a folder named like the app's, or named like that folder
+    assert index.is_installed(app('Editor', 'Something Else'))
+    assert index.is_installed(app('Viewer', 'Image Viewer'))
+    assert not index.is_installed(app('viewer', 'Image Viewer'))
+
+def test_publisher_match(tmp_path):
+    scanner = lambda: [{'name': 'Paint', 'install_dir': r'C:\Program Files\Paint',
+                        'publisher': 'Example Ltd'}]
+    index = make_index(tmp_path, scanner)
+    assert index.is_installed(app('PaintApp', 'paint', Publisher='example ltd'))
+    assert not index.is_installed(app('PaintApp', 'paint', Publisher='Someone'))
+    assert not index.is_installed(app('PaintApp', 'paint'))
+
+def test_record_install_and_uninstall(data_home, tmp_path):
+    app_data = app('Tool', 'Tool')
+    app_dir = data_home / 'DDPApps' / 'Tool'
+    app_dir.mkdir(parents=True)
+    write_entry(data_home / 'applications', 'tool.desktop', Name='Tool', Path=str(app_dir))
+    index = make_index(tmp_path)
+    assert index.is_installed(app_data)
+
+    index.record_install(app_data, app_dir)
+    assert InstalledIndex(path=tmp_path / 'installed.json').installed_files(app_data) == \
+        {'Tool.exe': '1' * 40}
+    assert index.referenced_shas() == {'1' * 40}
+
+    app_dir.rmdir()
+    index.record_uninstall(app_data)
+    assert not index.is_installed(app_data)
+    assert index.referenced_shas() == set()
+    # The cached scan no longer lists it either
+    reloaded = InstalledIndex(path=tmp_path / 'installed.json',
+                              system_cache_path=tmp_path / 'system_apps.json')
+    assert not reloaded.is_installed(app_data)
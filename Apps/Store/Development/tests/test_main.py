@@ -0,0 +1,76 @@
+import pytest
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import installed_index
+import main
+
+class FakeFetcher(QObject):
+    app_data_ready = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+    finished_loading = pyqtSignal()
+    rate_limited = pyqtSignal(float, list)
+    created = []
+
+    def __init__(self, repo_url, known_apps=None, priority_apps=None):
+        super().__init__()
+        self.priority_apps = priority_apps
+        FakeFetcher.created.append(self)
+
+    def start(self):
+        pass
+
+    def isRunning(self):
+        return False
+
+@pytest.fixture
+def store(qapp, tmp_path, monkeypatch):
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    monkeypatch.setattr(installed_index, '_installed_index', None)
+    apps = []
+    for i in range(40):
+        app_data = main.new_app_data(f"Apps/App{i:02d}")
+        app_data['name'] = f"{'Zebra' if i % 4 == 3 else 'Apple'} {i}"
+        apps.append(app_data)
+    monkeypatch.setattr(main, 'load_cached_catalog', lambda: apps)
+    monkeypatch.setattr(main, 'GitHubFetcher', FakeFetcher)
+    FakeFetcher.created.clear()
+
+    store = main.AppStore()
+    store.resize(1200, 800)
+    store.show()
+    qapp.processEvents()
+    yield store
+    store.hide()
+    store.deleteLater()
+
+def test_priority_apps_follow_the_filtered_view(store):
+    store.grid_view.search_box.setText("zebra")
+    shown = [app_data['app_path'] for app_data in store.apps_model.shown]
+    assert len(shown) == 10
+
+    store.grid_view.load_visible_logos()
+    store.load_apps()
+    priority_apps = FakeFetcher.created[-1].priority_apps
+    assert priority_apps
+    assert priority_apps == shown[:len(priority_apps)]
+
+def test_install_state_reaches_the_grid(store, qapp):
+    from app_detail_view import AppDetailView
+
+    app_data = store.apps_model.apps[5]
+    store.show_app_details(dict(app_data))
+    detail_view = store.stacked_widget.currentWidget().findChild(AppDetailView)
+    changed = []
+    store.apps_model.dataChanged.connect(lambda first, last, *args: changed.append(first.row()))
+
+    detail_view.app_data['is_installed'] = True
+    detail_view.installed_changed.emit(detail_view.app_data)
+    row = store.apps_model.shown_rows[app_data['app_path']]
+    assert store.apps_model.apps[5]['is_installed']
+    assert changed == [row]
+
+    detail_view.app_data['is_installed'] = False
+    detail_view.installed_changed.emit(detail_view.app_data)
+    assert not store.apps_model.apps[5]['is_installed']
+    store.show_grid_view()
+    qapp.processEvents()
@@ -0,0 +1,60 @@
+import os
+
+from installed_index import InstalledIndex
+from package_store import PackageStore
+
+def sha_of(number):
+    return f"{number:040x}"
+
+def make_store(tmp_path):
+    index = InstalledIndex(path=tmp_path / 'installed.json',
+                           system_cache_path=tmp_path / 'system_apps.json')
+    store = PackageStore(tmp_path / 'objects', installed_index=index)
+    return store, index
+
+def add_object(store, sha, suffix=''):
+    path = store.path_for(sha)
+    path = path.with_name(path.name + suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'data')
+    return path
+
+def test_collect_garbage_keeps_referenced_objects(tmp_path):
+    store, index = make_store(tmp_path)
+    installed, pinned, unused = sha_of(1), sha_of(2), sha_of(3)
+    index.record_install({'folder_name': 'App', 'package_files': [
+        {'name': 'app.exe', 'sha': installed}]}, tmp_path / 'App')
+    for sha in (installed, pinned, unused):
+        add_object(store, sha)
+    store.pin([pinned])
+
+    assert store.collect_garbage() == 1
+    assert store.contains(installed)
+    assert store.contains(pinned)
+    assert not store.contains(unused)
+
+    store.unpin([pinned])
+    assert store.collect_garbage() == 1
+    assert not store.contains(pinned)
+
+def test_collect_garbage_skips_temporary_files(tmp_path):
+    store, index = make_store(tmp_path)
+    sha = sha_of(4)
+    kept = [add_object(store, sha, suffix) for suffix in
+            ('.part', '.part.json', '.part.json.tmp', '.patch0', '.123.tmp')]
+    assert store.collect_garbage() == 0
+    assert all(os.path.exists(path) for path in kept)
+
+def test_collect_garbage_keeps_copied_objects(tmp_path):
+    # Copies made where hardlinks fail have a link count of one
+    store, index = make_store(tmp_path)
+    sha = sha_of(5)
+    add_object(store, sha)
+    destination = tmp_path / 'App' / 'app.exe'
+    destination.parent.mkdir()
+    store.link(sha, destination)
+    index.record_install({'folder_name': 'App', 'package_files': [
+        {'name': 'app.exe', 'sha': sha}]}, destination.parent)
+    os.remove(destination)
+    assert store.collect_garbage() == 0
+    assert store.contains(sha)
@@ -1,6 +1,5 @@
 import os
 import shutil
-import winreg
 import subprocess
 from pathlib import Path
 
@@ -29,7 +28,10 @@ def remove_shortcut(shortcut_name):
         os.remove(shortcut_path)
 
 def get_installed_apps():
-    """Get list of installed apps from registry"""
+    """Get installed apps from the registry, as dicts of name,
+    install_dir and publisher"""
+    import winreg
+    
     installed_apps = []
     
     # Check both 32-bit and 64-bit registry
@@ -43,9 +45,17 @@ def get_installed_apps():
                         with winreg.OpenKey(key, subkey_name) as subkey:
                             try:
                                 name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                                installed_apps.append(name)
                             except WindowsError:
-                                pass
+                                name = None
+                            if name:
+                                app = {'name': name, 'install_dir': None, 'publisher': None}
+                                for field, value_name in (('install_dir', "InstallLocation"),
+                                                          ('publisher', "Publisher")):
+                                    try:
+                                        app[field] = winreg.QueryValueEx(subkey, value_name)[0] or None
+                                    except WindowsError:
+                                        pass
+                                installed_apps.append(app)
                         i += 1
                     except WindowsError:
                         break
@@ -53,3 +63,40 @@ def get_installed_apps():
             continue
             
     return installed_apps
+
+def get_desktop_entry_apps():
+    """Get installed apps from freedesktop .desktop entries, as dicts of
+    name, install_dir (Path=, or the directory of an absolute Exec=) and
+    publisher (always None; entries have no such key)"""
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    installed_apps = []
+    
+    for data_dir in [data_home] + data_dirs.split(':'):
+        applications = Path(data_dir) / 'applications'
+        if not applications.is_dir():
+            continue
+        for entry in applications.glob('**/*.desktop'):
+            values = {}
+            try:
+                in_entry = False
+                with open(entry, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith('['):
+                            in_entry = line == '[Desktop Entry]'
+                        elif in_entry and '=' in line:
+                            key, value = line.split('=', 1)
+                            values.setdefault(key.strip(), value.strip())
+            except OSError:
+                continue
+            if not values.get('Name') or values.get('Hidden') == 'true':
+                continue
+            install_dir = values.get('Path') or None
+            command = values.get('Exec', '').split()
+            if not install_dir and command and os.path.isabs(command[0].strip('"')):
+                install_dir = os.path.dirname(command[0].strip('"'))
+            installed_apps.append({'name': values['Name'], 'install_dir': install_dir,
+                                   'publisher': None})
+                
+    return installed_apps
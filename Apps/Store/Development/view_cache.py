@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QLabel
+
+# Rough cost of a detail view's widgets, on top of the pixmaps it shows
+VIEW_BASE_COST = 512 * 1024
+
+def view_cost(widget):
+    cost = VIEW_BASE_COST
+    for label in widget.findChildren(QLabel):
+        pixmap = label.pixmap()
+        if pixmap is not None and not pixmap.isNull():
+            cost += pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    return cost
+
+class DetailViewCache:
+    """Recently opened detail views, kept alive in the stacked widget.
+
+    Going back to the grid only hides a detail view, so reopening the app
+    shows it again with its images already in place. Least recently used
+    views are deleted once there are more than max_views or their widgets
+    and pixmaps add up to more than max_bytes. The view on screen and
+    views with an install still running are never evicted.
+
+    Entries remember the app data they were built from; when the catalog
+    replaces an app's data, its view is rebuilt on the next open.
+    """
+
+    def __init__(self, stacked_widget, max_views=8, max_bytes=32 * 1024 * 1024):
+        self.stacked_widget = stacked_widget
+        self.max_views = max_views
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # app_path -> (app_data, container, view)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, app_data):
+        app_path = app_data['app_path']
+        entry = self.entries.get(app_path)
+        if entry is not None and entry[0] is not app_data and self.can_evict(entry):
+            self.remove(app_path)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(app_path)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, app_data, container, view):
+        app_path = app_data['app_path']
+        if app_path in self.entries:
+            self.remove(app_path)
+        self.stacked_widget.addWidget(container)
+        self.entries[app_path] = (app_data, container, view)
+        self.trim()
+
+    def discard(self, app_path):
+        """Drop an app's view after its data changed, unless it is in use"""
+        entry = self.entries.get(app_path)
+        if entry is not None and self.can_evict(entry):
+            self.remove(app_path)
+
+    def can_evict(self, entry):
+        _, container, view = entry
+        return container is not self.stacked_widget.currentWidget() and not view.installs
+
+    def remove(self, app_path):
+        _, container, _ = self.entries.pop(app_path)
+        self.stacked_widget.removeWidget(container)
+        container.deleteLater()
+
+    def trim(self):
+        # Images arrive after a view is built, so costs are measured here
+        costs = {app_path: view_cost(entry[1]) for app_path, entry in self.entries.items()}
+        total = sum(costs.values())
+        for app_path, entry in list(self.entries.items()):
+            if len(self.entries) <= self.max_views and total <= self.max_bytes:
+                break
+            if self.can_evict(entry):
+                self.remove(app_path)
+                total -= costs[app_path]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'views': len(self.entries),
+                'bytes': sum(view_cost(entry[1]) for entry in self.entries.values())}